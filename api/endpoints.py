@@ -1,6 +1,9 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+import json
 import time
 
 from src.retrieval.rag_pipeline import RAGPipeline
@@ -35,6 +38,7 @@ class Source(BaseModel):
     source: str
     score: float
     metadata: Optional[Dict] = None
+    doc_id: Optional[int] = None
 
 
 class QueryResponse(BaseModel):
@@ -45,6 +49,12 @@ class QueryResponse(BaseModel):
     query_time: float
 
 
+class SourceBatchRequest(BaseModel):
+    """Request model for batched source metadata lookups."""
+
+    ids: List[int]
+
+
 class HealthResponse(BaseModel):
     """Health check response model."""
 
@@ -89,23 +99,17 @@ async def query_knowledge_base(request: QueryRequest):
         start_time = time.time()
         logger.info(f"Processing query: {request.question}")
 
-        # Query the RAG pipeline
-        result = rag_pipeline.query(
-            question=request.question, top_k=request.max_sources
+        # Query the RAG pipeline in a worker thread; the call blocks on
+        # embedding and completion requests and would otherwise stall the
+        # event loop, including /health, for the whole generation
+        result = await run_in_threadpool(
+            rag_pipeline.query, question=request.question, top_k=request.max_sources
         )
 
         query_time = time.time() - start_time
 
         # Format sources
-        sources = [
-            Source(
-                content=doc.get("content", ""),
-                source=doc.get("metadata", {}).get("source", "Unknown"),
-                score=float(doc.get("score", 0.0)),
-                metadata=doc.get("metadata", {}),
-            )
-            for doc in result.get("retrieved_docs", [])
-        ]
+        sources = _to_sources(result.get("retrieved_docs", []))
 
         logger.info(f"Query completed in {query_time:.2f}s with {len(sources)} sources")
 
@@ -120,6 +124,112 @@ async def query_knowledge_base(request: QueryRequest):
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
 
+def _to_sources(retrieved_docs: List[Dict]) -> List[Source]:
+    """Convert retrieved documents to API source models."""
+    return [
+        Source(
+            content=doc.get("content", ""),
+            source=doc.get("source") or "Unknown",
+            score=float(doc.get("score", 0.0)),
+            metadata=doc.get("metadata", {}),
+            doc_id=doc.get("doc_id"),
+        )
+        for doc in retrieved_docs
+    ]
+
+
+def _sse_event(payload: Dict) -> str:
+    """Encode a payload as a server-sent event."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _stream_events(question: str, max_sources: Optional[int]) -> Iterator[str]:
+    """
+    Stream an answer as server-sent events.
+
+    Emits one {"token": ...} event per answer chunk, then a final event with
+    the sources and total query time. Source metadata is left out; clients
+    that need it fetch it from /sources/batch.
+    """
+    start_time = time.time()
+    try:
+        retrieved_docs = rag_pipeline.retrieve_for_answer(question, top_k=max_sources)
+        chunks = rag_pipeline.stream_query(
+            question, top_k=max_sources, retrieved_docs=retrieved_docs
+        )
+        try:
+            for chunk in chunks:
+                yield _sse_event({"token": chunk})
+        finally:
+            # A disconnected client stops the response mid-stream; close the
+            # pipeline stream right away so the LLM call is aborted too
+            chunks.close()
+
+        sources = _to_sources(retrieved_docs)
+        query_time = time.time() - start_time
+        logger.info(
+            f"Streamed query completed in {query_time:.2f}s "
+            f"with {len(sources)} sources"
+        )
+        yield _sse_event(
+            {
+                "sources": [
+                    source.model_dump(exclude={"metadata"}) for source in sources
+                ],
+                "query_time": query_time,
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error streaming query: {e}", exc_info=True)
+        yield _sse_event({"error": f"Error processing query: {str(e)}"})
+
+
+@router.post("/query/stream")
+def stream_knowledge_base(request: QueryRequest):
+    """
+    Query the knowledge base and stream the answer as server-sent events.
+
+    Args:
+        request: QueryRequest with question and optional parameters
+
+    Returns:
+        StreamingResponse of answer chunks followed by the sources
+
+    Raises:
+        HTTPException: If RAG pipeline is not initialized
+    """
+    if rag_pipeline is None:
+        raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
+
+    logger.info(f"Processing streaming query: {request.question}")
+    return StreamingResponse(
+        _stream_events(request.question, request.max_sources),
+        media_type="text/event-stream",
+    )
+
+
+@router.post("/sources/batch")
+async def get_sources_batch(request: SourceBatchRequest):
+    """
+    Get the metadata of several sources in one request.
+
+    Args:
+        request: SourceBatchRequest with the doc_id of each source
+
+    Returns:
+        Mapping of doc_id to source metadata
+
+    Raises:
+        HTTPException: If RAG pipeline is not initialized
+    """
+    if rag_pipeline is None:
+        raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
+
+    metadata = rag_pipeline.retriever.get_metadata_batch(request.ids)
+    return {"metadata": {str(doc_id): md for doc_id, md in metadata.items()}}
+
+
 @router.get("/stats")
 async def get_stats():
     """
@@ -144,6 +254,11 @@ async def get_stats():
                 if hasattr(rag_pipeline, "retriever")
                 else "unknown"
             ),
+            "retrieval_cache": (
+                rag_pipeline.retriever.stats()
+                if hasattr(rag_pipeline, "retriever")
+                else {}
+            ),
         }
         return stats
     except Exception as e:
@@ -44,6 +44,8 @@ def main():
             str(port),
             "--server.headless",
             "true",
+            "--server.enableStaticServing",
+            "true",
         ],
         env=env,
     )
@@ -38,6 +38,14 @@ class RetrievalConfig:
     similarity_threshold: float
     rerank: bool
     edge_case_min_score: float = 0.80
+    warmup: bool = True
+    index_type: str = "HNSW32,SQfp16"
+    ef_search: int = 64
+    nprobe: int = 16
+    faiss_threads: int = 0
+    compression: Optional[str] = None
+    use_gpu: bool = False
+    gpu_min_batch: int = 32
 
 
 @dataclass
@@ -195,6 +203,14 @@ class Settings:
             similarity_threshold=config.get("similarity_threshold", 0.7),
             rerank=config.get("rerank", False),
             edge_case_min_score=config.get("edge_case_min_score", 0.80),
+            warmup=config.get("warmup", True),
+            index_type=config.get("index_type", "HNSW32,SQfp16"),
+            ef_search=config.get("ef_search", 64),
+            nprobe=config.get("nprobe", 16),
+            faiss_threads=config.get("faiss_threads", 0),
+            compression=config.get("compression"),
+            use_gpu=config.get("use_gpu", False),
+            gpu_min_batch=config.get("gpu_min_batch", 32),
         )
 
     @property
@@ -1,5 +1,7 @@
 import json
+import os
 import pickle
+import re
 from pathlib import Path
 from typing import List, Dict
 import numpy as np
@@ -13,6 +15,24 @@ from src.config.settings import settings
 
 logger = get_logger(__name__)
 
+# Index factory strings for the retrieval.compression presets
+COMPRESSION_INDEX_TYPES = {
+    "sq8": "SQ8",  # 8-bit scalar quantizer, 4x smaller than float32
+    "pqfs": "IVF512,PQ32x4fs,RFlat",  # 4-bit PQ FastScan + exact re-rank
+}
+
+# Candidates re-ranked exactly per requested result for refined indexes
+REFINE_K_FACTOR = 4
+
+# Training vectors per IVF list below which FAISS clusters poorly
+IVF_MIN_POINTS_PER_LIST = 39
+
+# Number of inverted lists in an IVF factory string, e.g. "IVF512,..."
+IVF_NLIST_RE = re.compile(r"IVF(\d+)")
+
+# Lowercase word tokens stored per chunk for evaluation lookups
+TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+
 
 class IndexBuilder:
     """Builds and manages FAISS vector index."""
@@ -28,6 +48,18 @@ class IndexBuilder:
         self.dimension = settings.vector_store.dimension
         self.index_path = settings.vector_store.index_path
         self.metadata_path = settings.vector_store.metadata_path
+        self.index_type = settings.retrieval.index_type
+        compression = settings.retrieval.compression
+        if compression:
+            if compression not in COMPRESSION_INDEX_TYPES:
+                raise ValueError(
+                    f"Unknown compression '{compression}', expected one of "
+                    f"{sorted(COMPRESSION_INDEX_TYPES)}"
+                )
+            self.index_type = COMPRESSION_INDEX_TYPES[compression]
+        self.ef_search = settings.retrieval.ef_search
+        self.nprobe = settings.retrieval.nprobe
+        self.faiss_threads = settings.retrieval.faiss_threads
 
         # Create directories
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
@@ -82,10 +114,8 @@ class IndexBuilder:
         # FIXED: Normalize embeddings for cosine similarity
         faiss.normalize_L2(embeddings_array)
 
-        # FIXED: Create FAISS index using Inner Product (cosine similarity)
         logger.info("Creating FAISS index...")
-        index = faiss.IndexFlatIP(self.dimension)  # Changed from IndexFlatL2
-        index.add(embeddings_array)
+        index = self._create_index(embeddings_array)
 
         # Prepare metadata
         metadata = []
@@ -94,6 +124,7 @@ class IndexBuilder:
                 {
                     "doc_id": doc.doc_id,
                     "content": doc.content,
+                    "content_tokens": sorted(set(TOKEN_RE.findall(doc.content.lower()))),
                     "metadata": doc.metadata,
                     "index": i,
                 }
@@ -104,6 +135,84 @@ class IndexBuilder:
 
         logger.info(f"✓ Index built successfully with {index.ntotal} vectors")
 
+    def _create_index(self, embeddings: np.ndarray) -> faiss.Index:
+        """
+        Create and populate the FAISS index.
+
+        The index structure comes from the `retrieval.index_type` factory
+        string (HNSW graph over FP16 vectors by default) and always uses an
+        inner-product metric, i.e. cosine similarity on normalized
+        embeddings.
+
+        Args:
+            embeddings: Normalized float32 embeddings
+
+        Returns:
+            Populated FAISS index
+        """
+        index_type = self._fit_index_type(len(embeddings))
+        logger.info(f"Using FAISS index type: {index_type}")
+        index = faiss.index_factory(
+            self.dimension, index_type, faiss.METRIC_INNER_PRODUCT
+        )
+        if not index.is_trained:
+            index.train(embeddings)
+        index.add(embeddings)
+        self._configure_search(index)
+        return index
+
+    def _fit_index_type(self, num_vectors: int) -> str:
+        """
+        Check that an IVF index type has enough vectors to train on.
+
+        IVF training needs at least one vector per list and gives poor
+        clusters below IVF_MIN_POINTS_PER_LIST per list, so small corpora
+        fall back to the SQ8 preset instead of failing inside FAISS.
+
+        Args:
+            num_vectors: Number of embeddings to index
+
+        Returns:
+            Index factory string to build
+        """
+        match = IVF_NLIST_RE.search(self.index_type)
+        if not match:
+            return self.index_type
+
+        nlist = int(match.group(1))
+        if num_vectors >= nlist * IVF_MIN_POINTS_PER_LIST:
+            return self.index_type
+
+        fallback = COMPRESSION_INDEX_TYPES["sq8"]
+        logger.warning(
+            f"{num_vectors} vectors are too few to train {self.index_type} "
+            f"(needs {nlist * IVF_MIN_POINTS_PER_LIST}), using {fallback} instead"
+        )
+        return fallback
+
+    def _configure_search(self, index: faiss.Index) -> None:
+        """
+        Apply search-time parameters for approximate indexes.
+
+        Args:
+            index: FAISS index to configure
+        """
+        if hasattr(index, "k_factor"):
+            index.k_factor = REFINE_K_FACTOR
+
+        if hasattr(index, "hnsw"):
+            index.hnsw.efSearch = self.ef_search
+
+        try:
+            ivf = faiss.extract_index_ivf(index)
+        except RuntimeError:
+            return  # Not an IVF index
+
+        ivf.nprobe = self.nprobe
+        # Thread over inverted lists, which helps single-query interactive
+        # search; batched search (Retriever.retrieve_batch) would prefer 0
+        ivf.parallel_mode = 1
+
     def _save_index(self, index: faiss.Index, metadata: List[Dict]) -> None:
         """
         Save FAISS index and metadata to disk.
@@ -128,6 +237,29 @@ class IndexBuilder:
             logger.error(f"Error saving index: {e}")
             raise
 
+    @staticmethod
+    def build_metadata_columns(metadata: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Build column arrays of document metadata for vectorized filtering.
+
+        Args:
+            metadata: Metadata entries in index order
+
+        Returns:
+            Mapping of metadata key -> object array with one value per
+            document (None where the key is missing)
+        """
+        doc_metas = [entry.get("metadata", {}) for entry in metadata]
+        keys = {key for doc_meta in doc_metas for key in doc_meta}
+
+        columns = {}
+        for key in keys:
+            column = np.empty(len(doc_metas), dtype=object)
+            column[:] = [doc_meta.get(key) for doc_meta in doc_metas]
+            columns[key] = column
+
+        return columns
+
     def load_index(self) -> tuple:
         """
         Load FAISS index and metadata from disk.
@@ -145,13 +277,22 @@ class IndexBuilder:
                     "Please build the index first."
                 )
 
+            faiss.omp_set_num_threads(self.faiss_threads or os.cpu_count() or 1)
+
             # Load FAISS index
             index = faiss.read_index(str(index_file))
+            self._configure_search(index)
             logger.info(f"Loaded FAISS index with {index.ntotal} vectors")
 
             # Load metadata
             with open(metadata_file, "r", encoding="utf-8") as f:
                 metadata = json.load(f)
+
+            # Token lists are stored sorted for JSON; use sets in memory
+            entries = metadata.values() if isinstance(metadata, dict) else metadata
+            for entry in entries:
+                if "content_tokens" in entry:
+                    entry["content_tokens"] = frozenset(entry["content_tokens"])
             logger.info(f"Loaded metadata for {len(metadata)} documents")
 
             return index, metadata
@@ -1,8 +1,8 @@
 import os
 from typing import List, Union
 import numpy as np
-from openai import OpenAI
 from src.utils.logger import get_logger
+from src.utils.openai_client import get_openai_client
 from src.config.settings import settings
 
 logger = get_logger(__name__)
@@ -13,7 +13,7 @@ class Embedder:
 
     def __init__(self):
         """Initialize embedder with OpenAI client."""
-        self.client = OpenAI(api_key=settings.openai.api_key)
+        self.client = get_openai_client()
         self.model = settings.openai.embedding_model
         self.dimension = settings.vector_store.dimension
         logger.info(f"Initialized Embedder with model: {self.model}")
@@ -39,7 +39,7 @@ class Embedder:
             response = self.client.embeddings.create(input=text, model=self.model)
 
             embedding = response.data[0].embedding
-            logger.debug(f"Generated embedding of dimension {len(embedding)}")
+            logger.debug("Generated embedding of dimension %d", len(embedding))
 
             return embedding
 
@@ -93,5 +93,5 @@ class Embedder:
         Returns:
             Query embedding vector
         """
-        logger.debug(f"Generating query embedding for: {query[:100]}...")
+        logger.debug("Generating query embedding for: %.100s...", query)
         return self.embed_text(query)
@@ -1,7 +1,7 @@
 from typing import List, Dict, Optional, Generator
-from openai import OpenAI
 
 from src.utils.logger import get_logger
+from src.utils.openai_client import get_openai_client
 from src.config.settings import settings
 
 logger = get_logger(__name__)
@@ -12,7 +12,7 @@ class LLM:
 
     def __init__(self):
         """Initialize LLM client."""
-        self.client = OpenAI(api_key=settings.openai.api_key)
+        self.client = get_openai_client()
         self.model = settings.openai.model
         self.temperature = settings.openai.temperature
         self.max_tokens = settings.openai.max_tokens
@@ -1,4 +1,5 @@
-from typing import List, Dict, Optional
+import functools
+from typing import List, Dict, Optional, Tuple
 from src.config.prompts import (
     QUERY_PROMPT_TEMPLATE,
     CHAT_PROMPT_TEMPLATE,
@@ -22,6 +23,10 @@ class PromptBuilder:
             max_context_length: Maximum length of context in characters
         """
         self.max_context_length = settings.generation.max_context_length
+
+        # Memoize prompts for repeated questions (e.g. evaluation replays)
+        self._build_cached = functools.lru_cache(maxsize=256)(self._build_prompt_impl)
+
         logger.info("Initialized PromptBuilder")
 
     def build_prompt(
@@ -41,6 +46,46 @@ class PromptBuilder:
         Returns:
             Formatted prompt string
         """
+        docs_key = tuple(
+            (
+                doc.get("metadata", {}).get("filename", "Unknown"),
+                doc.get("content", ""),
+                doc.get("score", 0.0),
+            )
+            for doc in retrieved_docs
+        )
+        history_key = tuple(
+            (msg.get("role", "user"), msg.get("content", ""))
+            for msg in (chat_history or [])[-5:]
+        )
+
+        return self._build_cached(question, docs_key, history_key)
+
+    def _build_prompt_impl(
+        self,
+        question: str,
+        docs_key: Tuple[Tuple[str, str, float], ...],
+        history_key: Tuple[Tuple[str, str], ...],
+    ) -> str:
+        """
+        Build prompt from hashable document and history keys.
+
+        Args:
+            question: User question
+            docs_key: Tuples of (filename, content, score) per document
+            history_key: Tuples of (role, content) for recent chat messages
+
+        Returns:
+            Formatted prompt string
+        """
+        retrieved_docs = [
+            {"metadata": {"filename": filename}, "content": content, "score": score}
+            for filename, content, score in docs_key
+        ]
+        chat_history = [
+            {"role": role, "content": content} for role, content in history_key
+        ]
+
         # Format context from retrieved documents
         context = format_context(retrieved_docs)
 
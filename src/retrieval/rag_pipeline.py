@@ -1,14 +1,47 @@
+import io
+import json
+import re
+from enum import IntEnum
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from openai import OpenAI
 
 from src.config.prompts import SYSTEM_PROMPT
 from src.retrieval.retriever import Retriever
 from src.generation.prompt_builder import PromptBuilder
 from src.utils.logger import get_logger
+from src.utils.openai_client import get_openai_client
 from src.config.settings import settings
 
 logger = get_logger(__name__)
 
+# Shared pool for overlapping the network-bound query embedding calls
+# of multi-question entry points (FAISS search releases the GIL)
+RETRIEVAL_WORKERS = 16
+_EXEC = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS)
+
+# Minimum number of characters to accumulate before yielding a stream chunk
+STREAM_CHUNK_CHARS = 64
+
+# Answer returned when retrieval finds nothing relevant enough
+INSUFFICIENT_INFO_ANSWER = (
+    "I don't have enough information in the knowledge base to answer this "
+    "question. Could you try rephrasing or ask something else about GitLab?"
+)
+
+# Batch job states that will never produce results
+BATCH_TERMINAL_FAILURES = ("failed", "expired", "cancelled")
+
+# Prefix of the ID returned when no question needed the Batch API
+LOCAL_BATCH_PREFIX = "local-"
+
+
+class QueryType(IntEnum):
+    """Classification of an incoming question."""
+
+    NORMAL = 0
+    GREETING = 1
+    INTRO = 2
+
 
 class RAGPipeline:
     """End-to-end RAG pipeline for question answering."""
@@ -17,11 +50,12 @@ class RAGPipeline:
         """Initialize RAG pipeline components."""
         self.retriever = Retriever()
         self.prompt_builder = PromptBuilder()
-        self.client = OpenAI(api_key=settings.openai.api_key)
+        self.client = get_openai_client()
         self.model = settings.openai.model
         self.temperature = settings.openai.temperature
         self.max_tokens = settings.openai.max_tokens
         self.edge_case_min_score = settings.retrieval.edge_case_min_score
+        self._system_prompt = settings.get("generation.system_prompt")
 
         # Greeting patterns
         self.greeting_patterns = [
@@ -52,21 +86,69 @@ class RAGPipeline:
             "how does this work",
         ]
 
+        # Single pass classifier: greetings must prefix the question,
+        # intro phrases may appear anywhere
+        self._classifier_re = re.compile(
+            "^(?P<greeting>{})|(?P<intro>{})".format(
+                "|".join(map(re.escape, self.greeting_patterns)),
+                "|".join(map(re.escape, self.intro_patterns)),
+            )
+        )
+
+        self.hallucination_indicators = [
+            "it is widely known",
+            "according to common knowledge",
+            "in my experience",
+            "as we all know",
+            "everyone knows",
+            "i think",
+            "i believe",
+            "in my opinion",
+        ]
+        self._hallucination_re = re.compile(
+            "|".join(map(re.escape, self.hallucination_indicators))
+        )
+
         logger.info("Initialized RAG Pipeline")
 
-    def _is_greeting(self, question: str) -> bool:
-        """Check if question is a greeting."""
-        question_lower = question.lower().strip()
+    def _classify(self, question: str) -> QueryType:
+        """Classify question as a greeting, intro request or normal query."""
+        match = self._classifier_re.search(question.lower().strip())
+
+        if match is None:
+            return QueryType.NORMAL
+        if match.group("greeting") is not None:
+            return QueryType.GREETING
+        return QueryType.INTRO
+
+    def _has_confident_match(self, retrieved_docs: List[Dict]) -> bool:
+        """Check that the best retrieved document clears edge_case_min_score."""
+        if not retrieved_docs:
+            return False
+        best_score = max(doc.get("score", 0.0) for doc in retrieved_docs)
+        return best_score >= self.edge_case_min_score
+
+    def retrieve_for_answer(
+        self, question: str, top_k: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Retrieve the documents an answer to the question would be grounded in.
 
-        # Exact match or starts with greeting
-        return question_lower in self.greeting_patterns or any(
-            question_lower.startswith(g) for g in self.greeting_patterns
-        )
+        Args:
+            question: User question
+            top_k: Number of documents to retrieve
 
-    def _is_intro_request(self, question: str) -> bool:
-        """Check if question is asking for introduction/help."""
-        question_lower = question.lower().strip()
-        return any(pattern in question_lower for pattern in self.intro_patterns)
+        Returns:
+            Retrieved documents, or an empty list for greetings, intro
+            requests and questions without a confident match
+        """
+        if self._classify(question) != QueryType.NORMAL:
+            return []
+
+        retrieved_docs = self.retriever.retrieve(question, top_k=top_k)
+        if not self._has_confident_match(retrieved_docs):
+            return []
+        return retrieved_docs
 
     def _generate_greeting_response(self) -> str:
         """Generate friendly greeting response."""
@@ -110,6 +192,7 @@ class RAGPipeline:
         question: str,
         chat_history: Optional[List[Dict]] = None,
         top_k: Optional[int] = None,
+        retrieved_docs: Optional[List[Dict]] = None,
     ) -> Dict:
         """
         Process a question through the RAG pipeline.
@@ -118,15 +201,18 @@ class RAGPipeline:
             question: User question
             chat_history: Previous chat messages
             top_k: Number of documents to retrieve
+            retrieved_docs: Pre-retrieved documents (skips retrieval)
 
         Returns:
             Dictionary containing answer, sources, and metadata
         """
-        logger.info(f"Processing query: {question}")
+        logger.info("Processing query: %.100s", question)
 
         try:
+            query_type = self._classify(question)
+
             # ADDED: Handle greetings
-            if self._is_greeting(question):
+            if query_type == QueryType.GREETING:
                 logger.info("Detected greeting, returning friendly response")
                 return {
                     "answer": self._generate_greeting_response(),
@@ -137,7 +223,7 @@ class RAGPipeline:
                 }
 
             # Handle introduction requests
-            if self._is_intro_request(question):
+            if query_type == QueryType.INTRO:
                 logger.info("Detected intro request, returning capabilities")
                 return {
                     "answer": self._generate_intro_response(),
@@ -148,13 +234,14 @@ class RAGPipeline:
                 }
 
             # Step 1: Retrieve relevant documents
-            retrieved_docs = self.retriever.retrieve(question, top_k=top_k)
+            if retrieved_docs is None:
+                retrieved_docs = self.retriever.retrieve(question, top_k=top_k)
 
             # IMPROVED: Check if retrieval quality is too low
             if not retrieved_docs:
                 logger.warning("No relevant documents found")
                 return {
-                    "answer": "I don't have enough information in the knowledge base to answer this question. Could you try rephrasing or ask something else about GitLab?",
+                    "answer": INSUFFICIENT_INFO_ANSWER,
                     "sources": [],
                     "retrieved_docs": [],
                     "model": self.model,
@@ -167,13 +254,13 @@ class RAGPipeline:
                     f"Retrieved docs have low relevance (best: {best_score:.2%})"
                 )
                 return {
-                    "answer": "I don't have enough information in the knowledge base to answer this question. Could you try rephrasing or ask something else about GitLab?",
+                    "answer": INSUFFICIENT_INFO_ANSWER,
                     "sources": [],
                     "retrieved_docs": [],
                     "model": self.model,
                 }
 
-            logger.info(f"Retrieved {len(retrieved_docs)} documents")
+            logger.info("Retrieved %d documents", len(retrieved_docs))
 
             # Step 2: Build prompt
             prompt = self.prompt_builder.build_prompt(
@@ -189,7 +276,7 @@ class RAGPipeline:
                 messages=[
                     {
                         "role": "system",
-                        "content": settings.get("generation.system_prompt"),
+                        "content": self._system_prompt,
                     },
                     {"role": "user", "content": prompt},
                 ],
@@ -234,19 +321,18 @@ class RAGPipeline:
         seen_sources = set()
 
         for doc in retrieved_docs:
-            metadata = doc["metadata"]
-            source_id = metadata.get("filename", "Unknown")
+            filename = doc["filename"]
 
-            if source_id not in seen_sources:
+            if filename not in seen_sources:
                 sources.append(
                     {
-                        "filename": metadata.get("filename", "Unknown"),
-                        "source": metadata.get("source", ""),
-                        "file_type": metadata.get("file_type", ""),
+                        "filename": filename,
+                        "source": doc["source"],
+                        "file_type": doc["file_type"],
                         "relevance_score": doc["score"],
                     }
                 )
-                seen_sources.add(source_id)
+                seen_sources.add(filename)
 
         return sources
 
@@ -255,6 +341,7 @@ class RAGPipeline:
         question: str,
         chat_history: Optional[List[Dict]] = None,
         top_k: Optional[int] = None,
+        retrieved_docs: Optional[List[Dict]] = None,
     ):
         """
         Process query with streaming response.
@@ -263,18 +350,28 @@ class RAGPipeline:
             question: User question
             chat_history: Previous chat messages
             top_k: Number of documents to retrieve
+            retrieved_docs: Pre-retrieved documents (skips retrieval)
 
         Yields:
             Chunks of generated text
         """
-        logger.info(f"Processing streaming query: {question}")
+        logger.info("Processing streaming query: %.100s", question)
 
         try:
+            query_type = self._classify(question)
+            if query_type == QueryType.GREETING:
+                yield self._generate_greeting_response()
+                return
+            if query_type == QueryType.INTRO:
+                yield self._generate_intro_response()
+                return
+
             # Retrieve documents
-            retrieved_docs = self.retriever.retrieve(question, top_k=top_k)
+            if retrieved_docs is None:
+                retrieved_docs = self.retriever.retrieve(question, top_k=top_k)
 
-            if not retrieved_docs:
-                yield "I'm sorry, I couldn't find any relevant information to answer your question."
+            if not self._has_confident_match(retrieved_docs):
+                yield INSUFFICIENT_INFO_ANSWER
                 return
 
             # Build prompt
@@ -290,48 +387,234 @@ class RAGPipeline:
                 messages=[
                     {
                         "role": "system",
-                        "content": settings.get("generation.system_prompt"),
+                        "content": self._system_prompt,
                     },
                     {"role": "user", "content": prompt},
                 ],
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
                 stream=True,
+                stream_options={"include_usage": True},
             )
 
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            # Coalesce small deltas to cut per-token yields downstream
+            buffer = []
+            buffer_len = 0
+            usage = None
+
+            # Closing the stream (also on GeneratorExit when the client goes
+            # away) aborts the upstream request instead of finishing it
+            with stream:
+                for chunk in stream:
+                    if chunk.usage:
+                        usage = chunk.usage
+
+                    # The final usage chunk carries no choices
+                    if not chunk.choices:
+                        continue
+
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        buffer.append(content)
+                        buffer_len += len(content)
+
+                        if buffer_len >= STREAM_CHUNK_CHARS:
+                            yield "".join(buffer)
+                            buffer.clear()
+                            buffer_len = 0
+
+                if buffer:
+                    yield "".join(buffer)
+
+            if usage:
+                logger.info(
+                    f"Streamed answer used {usage.prompt_tokens} prompt + "
+                    f"{usage.completion_tokens} completion tokens"
+                )
 
         except Exception as e:
             logger.error(f"Error in streaming query: {e}")
             yield f"Error: {str(e)}"
 
-    def _answer_seems_unfaithful(self, answer: str, retrieved_docs: List[Dict]) -> bool:
+    def submit_batch(self, questions: List[str], top_k: Optional[int] = None) -> str:
         """
-        Check if answer contains information not in context.
+        Submit questions as an offline OpenAI Batch API job.
 
-        Simple heuristic: Check for common hallucination phrases.
+        Intended for nightly evaluation, dataset labeling or bulk FAQ
+        pre-generation, where the lower cost and separate rate limits of
+        the Batch API outweigh its latency.
+
+        Questions go through `retrieve_for_answer` like online queries, and
+        question i is sent with custom_id "question-i". Greetings, intro
+        requests and questions without a confident match are not sent;
+        `poll_batch` gives them the same canned answers as `query`.
+
+        Args:
+            questions: Questions to answer
+            top_k: Number of documents to retrieve per question
+
+        Returns:
+            Batch job ID to pass to `poll_batch`
         """
-        # CRITICAL HALLUCINATION INDICATORS ONLY
-        hallucination_indicators = [
-            "it is widely known",
-            "according to common knowledge",
-            "in my experience",
-            "as we all know",
-            "everyone knows",
-            "i think",
-            "i believe",
-            "in my opinion",
+        logger.info(f"Preparing batch job for {len(questions)} questions")
+
+        buffer = io.BytesIO()
+        num_requests = 0
+        futures = [
+            _EXEC.submit(self.retrieve_for_answer, question, top_k)
+            for question in questions
         ]
+        for i, (question, future) in enumerate(zip(questions, futures)):
+            retrieved_docs = future.result()
+            if not retrieved_docs:
+                logger.info(f"Batch question {i} is answered locally")
+                continue
+
+            prompt = self.prompt_builder.build_prompt(
+                question=question, retrieved_docs=retrieved_docs
+            )
+            request = {
+                "custom_id": f"question-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": self._system_prompt,
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    "temperature": self.temperature,
+                    "max_tokens": self.max_tokens,
+                },
+            }
+            buffer.write(json.dumps(request).encode("utf-8") + b"\n")
+            num_requests += 1
+
+        # The API rejects an empty input file, so answer everything locally
+        if num_requests == 0:
+            logger.info("All batch questions are answered locally")
+            return f"{LOCAL_BATCH_PREFIX}{len(questions)}"
+
+        buffer.seek(0)
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", buffer), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"num_questions": str(len(questions))},
+        )
 
-        answer_lower = answer.lower()
+        logger.info(f"Submitted batch job {batch.id}")
+        return batch.id
 
+    def poll_batch(
+        self, batch_id: str, questions: List[str]
+    ) -> Optional[List[Dict]]:
+        """
+        Fetch results of a batch job submitted with `submit_batch`.
+
+        Args:
+            batch_id: Batch job ID
+            questions: The questions passed to `submit_batch`, used to answer
+                the ones that were not sent
+
+        Returns:
+            One result dictionary per submitted question, in question order
+            (result i has custom_id "question-i"), or None if the job has
+            not completed yet. Requests that failed carry an "error".
+
+        Raises:
+            ValueError: If questions does not match the submitted job
+            RuntimeError: If the job failed, expired or was cancelled
+        """
+        if batch_id.startswith(LOCAL_BATCH_PREFIX):
+            if int(batch_id[len(LOCAL_BATCH_PREFIX) :]) != len(questions):
+                raise ValueError(f"Batch job {batch_id} does not match questions")
+            return [
+                self._local_batch_result(i, question)
+                for i, question in enumerate(questions)
+            ]
+
+        batch = self.client.batches.retrieve(batch_id)
+
+        num_questions = (batch.metadata or {}).get("num_questions")
+        if num_questions is not None and int(num_questions) != len(questions):
+            raise ValueError(f"Batch job {batch_id} does not match questions")
+
+        if batch.status in BATCH_TERMINAL_FAILURES:
+            raise RuntimeError(
+                f"Batch job {batch_id} {batch.status}: {batch.errors or 'no details'}"
+            )
+
+        if batch.status != "completed":
+            logger.info(f"Batch job {batch_id} status: {batch.status}")
+            return None
+
+        # Successful requests land in the output file, failed ones in the
+        # error file; either may be missing
+        results_by_index = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id is None:
+                continue
+
+            output = self.client.files.content(file_id)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                body = response.get("body") or {}
+                choices = body.get("choices") or [{}]
+                index = int(record["custom_id"].rsplit("-", 1)[1])
+                results_by_index[index] = {
+                    "custom_id": record["custom_id"],
+                    "answer": choices[0].get("message", {}).get("content", ""),
+                    "model": body.get("model", self.model),
+                    "error": record.get("error") or body.get("error"),
+                }
+
+        # Questions answered locally were never sent
+        results = [
+            results_by_index.get(i) or self._local_batch_result(i, question)
+            for i, question in enumerate(questions)
+        ]
+
+        logger.info(f"Batch job {batch_id} returned {len(results)} results")
+        return results
+
+    def _local_batch_result(self, index: int, question: str) -> Dict:
+        """Result for a batch question answered without the Batch API."""
+        query_type = self._classify(question)
+        if query_type == QueryType.GREETING:
+            answer = self._generate_greeting_response()
+        elif query_type == QueryType.INTRO:
+            answer = self._generate_intro_response()
+        else:
+            answer = INSUFFICIENT_INFO_ANSWER
+
+        return {
+            "custom_id": f"question-{index}",
+            "answer": answer,
+            "model": self.model,
+            "error": None,
+        }
+
+    def _answer_seems_unfaithful(self, answer: str, retrieved_docs: List[Dict]) -> bool:
+        """
+        Check if answer contains information not in context.
+
+        Simple heuristic: Check for common hallucination phrases.
+        """
         # Check for clear hallucination phrases
-        for indicator in hallucination_indicators:
-            if indicator in answer_lower:
-                logger.warning(f"Hallucination phrase detected: '{indicator}'")
-                return True
+        match = self._hallucination_re.search(answer.lower())
+        if match:
+            logger.warning(f"Hallucination phrase detected: '{match.group(0)}'")
+            return True
 
         return False
 
@@ -1,6 +1,9 @@
+import hashlib
+import threading
 import numpy as np
 from typing import List, Dict, Optional
 import faiss
+from cachetools import LRUCache, TTLCache
 
 from src.embeddings.embedder import Embedder
 from src.embeddings.build_index import IndexBuilder
@@ -9,6 +12,12 @@ from src.config.settings import settings
 
 logger = get_logger(__name__)
 
+# Bounded caches for repeated queries (chat retries, evaluation replays)
+EMBEDDING_CACHE_SIZE = 1024
+SEARCH_CACHE_SIZE = 1024
+RESULT_CACHE_SIZE = 4096
+RESULT_CACHE_TTL = 600  # seconds
+
 
 class Retriever:
     """Handles document retrieval from FAISS vector store."""
@@ -21,16 +30,43 @@ class Retriever:
         self.rerank = settings.retrieval.rerank
         self.similarity_threshold = settings.retrieval.similarity_threshold
         self.edge_case_min_score = settings.retrieval.edge_case_min_score
+        self.use_gpu = settings.retrieval.use_gpu
+        self.gpu_min_batch = settings.retrieval.gpu_min_batch
+        self._gpu_index = None
 
         # Load index
         self.index, self.metadata = self._load_index()
+        self.meta_cols = IndexBuilder.build_metadata_columns(
+            [self._get_doc_metadata(i) for i in range(self.index.ntotal)]
+        )
+
+        self._cache_lock = threading.Lock()
+        self._embedding_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+        self._search_cache = LRUCache(maxsize=SEARCH_CACHE_SIZE)
+        self._result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        self._result_hits = 0
+        self._result_misses = 0
 
         logger.info(f"Initialized Retriever with {len(self.metadata)} documents")
 
+        if settings.retrieval.warmup:
+            threading.Thread(target=self._warmup, daemon=True).start()
+
     def _load_index(self) -> tuple:
         """Load FAISS index and metadata."""
         try:
-            return self.index_builder.load_index()
+            index, metadata = self.index_builder.load_index()
+
+            # Scores are read directly as cosine similarity, which only
+            # holds for inner-product indexes over normalized vectors
+            if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+                logger.warning(
+                    "FAISS index does not use inner product; similarity scores "
+                    "will be wrong. Rebuild the index with "
+                    "python -m src.embeddings.build_index"
+                )
+
+            return index, metadata
         except FileNotFoundError as e:
             logger.error(str(e))
             logger.info(
@@ -38,6 +74,37 @@ class Retriever:
             )
             raise
 
+    def _warmup(self) -> None:
+        """
+        Warm FAISS and the OpenAI connection so the first query is not slow.
+
+        Runs a dummy search, touches the first stored vectors and embeds a
+        short string, which also opens the shared HTTP connection used for
+        completions.
+        """
+        # Embed first, so a FAISS failure below cannot skip the connection
+        try:
+            self.embedder.embed_query("warmup")
+        except Exception as e:
+            logger.warning(f"Embedding warm-up failed: {e}")
+
+        try:
+            self.index.search(np.zeros((1, self.index.d), dtype="float32"), 1)
+        except Exception as e:
+            logger.warning(f"Index search warm-up failed: {e}")
+            return
+
+        # IVF indexes without a direct map cannot reconstruct vectors
+        if self.index.ntotal > 0:
+            try:
+                np.asarray(
+                    self.index.reconstruct_n(0, min(self.index.ntotal, 1024))
+                ).sum()
+            except RuntimeError as e:
+                logger.debug(f"Skipping vector warm-up: {e}")
+
+        logger.debug("Retriever warm-up complete")
+
     def retrieve(
         self,
         query: str,
@@ -60,104 +127,358 @@ class Retriever:
         if similarity_threshold is None:
             similarity_threshold = self.similarity_threshold
 
-        logger.info(f"Retrieving top-{top_k} documents for query: {query}...")
+        result_key = self._result_key(query, top_k, similarity_threshold)
+        cached = self._get_cached_results(result_key)
+        if cached is not None:
+            logger.debug("Result cache hit for query: %.100s...", query)
+            return cached
 
-        try:
-            # Generate query embedding
-            query_embedding = self.embedder.embed_query(query)
-            query_vector = np.array(query_embedding).astype("float32").reshape(1, -1)
+        logger.debug("Retrieving top-%d documents for query: %.100s...", top_k, query)
 
-            # Normalize query vector for cosine similarity
-            faiss.normalize_L2(query_vector)
+        try:
+            query_key = self._query_key(query)
+            query_vector = self._embed_query(query, query_key)
 
             # Search in FAISS index - retrieve MORE to account for deduplication
-            search_k = top_k * 3
-            distances, indices = self.index.search(query_vector, search_k)
-
-            # Convert to results with metadata
-            results = []
-            seen_sources = set()
-
-            # ADDED: Track maximum score to detect low-quality retrieval
-            max_score = 0.0
-
-            for idx, (distance, doc_idx) in enumerate(zip(distances[0], indices[0])):
-                if doc_idx == -1:
-                    break
-
-                # With IndexFlatIP, distances ARE similarity scores (0-1 range)
-                similarity_score = float(distance)
-
-                # CAP at 1.0 for safety
-                normalized_score = min(max(similarity_score, 0.0), 1.0)
-
-                # Track max score
-                if normalized_score > max_score:
-                    max_score = normalized_score
-
-                # Get metadata
-                if isinstance(self.metadata, dict):
-                    doc_metadata = self.metadata.get(str(doc_idx), {})
-                elif isinstance(self.metadata, list):
-                    doc_metadata = (
-                        self.metadata[doc_idx]
-                        if 0 <= doc_idx < len(self.metadata)
-                        else {}
-                    )
-                else:
-                    doc_metadata = {}
-
-                content = doc_metadata.get("content", "")
-                source_file = doc_metadata.get("metadata", {}).get("source", "")
-
-                # Deduplicate by source file
-                if source_file in seen_sources:
-                    continue
-                seen_sources.add(source_file)
-
-                # Apply threshold filter
-                if normalized_score >= similarity_threshold:
-                    results.append(
-                        {
-                            "content": content,
-                            "metadata": doc_metadata.get("metadata", {}),
-                            "score": normalized_score,
-                        }
-                    )
-
-                # Stop once we have enough unique sources
-                if len(results) >= top_k:
-                    break
-
-            # FIX: If max score is below edge case min score, consider this a low-quality retrieval
-            # Return empty results to trigger "no information" response
-            if max_score < self.edge_case_min_score:
-                logger.warning(
-                    f"Low retrieval quality (max score: {max_score:.2%}). "
-                    f"Returning no results for out-of-scope query."
-                )
-                return []
-
-            logger.info(
-                f"Retrieved {len(results)} unique documents (threshold: {similarity_threshold})"
+            search_key = (query_key, top_k * 3)
+            with self._cache_lock:
+                hits = self._search_cache.get(search_key)
+            if hits is None:
+                hits = self.index.search(query_vector, top_k * 3)
+                with self._cache_lock:
+                    self._search_cache[search_key] = hits
+            distances, indices = hits
+
+            results = self._collect_results(
+                distances[0], indices[0], top_k, similarity_threshold
             )
 
             # Optional: Rerank results
             if self.rerank:
                 results = self._rerank_results(query, results)
 
+            self._store_results(result_key, results)
             return results
 
         except Exception as e:
             logger.error(f"Error during retrieval: {e}")
             raise
 
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+    ) -> List[List[Dict]]:
+        """
+        Retrieve documents for many queries with a single FAISS search.
+
+        Embeds all queries in one request and searches them as one
+        (nq, d) matrix, letting FAISS parallelize over queries. IVF indexes
+        are configured with parallel_mode=1 for interactive single queries;
+        large offline batches may run faster with parallel_mode=0.
+
+        Args:
+            queries: Search queries
+            top_k: Number of documents to retrieve per query
+            similarity_threshold: Minimum similarity score
+
+        Returns:
+            List of retrieved document lists, in query order
+        """
+        if not queries:
+            return []
+        if top_k is None:
+            top_k = self.top_k
+        if similarity_threshold is None:
+            similarity_threshold = self.similarity_threshold
+
+        logger.info("Retrieving top-%d documents for %d queries", top_k, len(queries))
+
+        try:
+            query_embeddings = self.embedder.embed_batch(queries)
+            query_vectors = np.asarray(query_embeddings, dtype=np.float32)
+            faiss.normalize_L2(query_vectors)
+
+            index = self._batch_index(len(queries))
+            distances, indices = index.search(query_vectors, top_k * 3)
+
+            all_results = []
+            for query, row_distances, row_indices in zip(queries, distances, indices):
+                results = self._collect_results(
+                    row_distances, row_indices, top_k, similarity_threshold
+                )
+                if self.rerank:
+                    results = self._rerank_results(query, results)
+                all_results.append(results)
+
+            return all_results
+
+        except Exception as e:
+            logger.error(f"Error during batch retrieval: {e}")
+            raise
+
+    def _batch_index(self, num_queries: int) -> faiss.Index:
+        """
+        Choose the index to serve a batched search.
+
+        Large batches go to a GPU copy of the index when `use_gpu` is set
+        and a GPU is available; GPUs only pay off for batched queries.
+
+        Args:
+            num_queries: Number of queries in the batch
+
+        Returns:
+            GPU index if enabled and worthwhile, otherwise the CPU index
+        """
+        if not self.use_gpu or num_queries < self.gpu_min_batch:
+            return self.index
+
+        if self._gpu_index is None:
+            if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+                logger.warning("GPU search requested but no GPU available")
+                self.use_gpu = False
+                return self.index
+
+            try:
+                options = faiss.GpuClonerOptions()
+                options.useFloat16 = True
+                self._gpu_resources = faiss.StandardGpuResources()
+                self._gpu_index = faiss.index_cpu_to_gpu(
+                    self._gpu_resources, 0, self.index, options
+                )
+                logger.info("Moved FAISS index to GPU for batched search")
+            except RuntimeError as e:
+                # e.g. HNSW has no GPU implementation
+                logger.warning(f"Could not move FAISS index to GPU: {e}")
+                self.use_gpu = False
+                return self.index
+
+        return self._gpu_index
+
+    @staticmethod
+    def _query_key(query: str) -> str:
+        """Cache key for a query, insensitive to case and outer whitespace."""
+        return hashlib.sha1(query.strip().lower().encode("utf-8")).hexdigest()
+
+    def _embed_query(self, query: str, query_key: Optional[str] = None) -> np.ndarray:
+        """
+        Embed a query as a normalized (1, d) float32 vector.
+
+        Embeddings are cached by query key, so repeated queries skip the
+        embedding API call.
+
+        Args:
+            query: Search query
+            query_key: Precomputed cache key for the query
+
+        Returns:
+            Query vector ready for FAISS search
+        """
+        if query_key is None:
+            query_key = self._query_key(query)
+
+        with self._cache_lock:
+            query_vector = self._embedding_cache.get(query_key)
+        if query_vector is not None:
+            return query_vector
+
+        query_embedding = self.embedder.embed_query(query)
+        # Convert straight to float32 rather than via an intermediate float64 array
+        query_vector = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+
+        # Normalize query vector for cosine similarity
+        faiss.normalize_L2(query_vector)
+
+        with self._cache_lock:
+            self._embedding_cache[query_key] = query_vector
+
+        return query_vector
+
+    @staticmethod
+    def _result_key(
+        query: str,
+        top_k: int,
+        similarity_threshold: float,
+        metadata_filter: Optional[Dict] = None,
+    ) -> bytes:
+        """Cache key for a complete retrieval request."""
+        filter_str = repr(sorted(metadata_filter.items())) if metadata_filter else ""
+        raw = f"{query.strip().lower()}|{top_k}|{similarity_threshold}|{filter_str}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+    def _get_cached_results(self, key: bytes) -> Optional[List[Dict]]:
+        """Look up cached results, returning copies safe for callers to mutate."""
+        with self._cache_lock:
+            results = self._result_cache.get(key)
+            if results is None:
+                self._result_misses += 1
+                return None
+            self._result_hits += 1
+        return [self._copy_result(result) for result in results]
+
+    def _store_results(self, key: bytes, results: List[Dict]) -> None:
+        """Cache a copy of retrieval results."""
+        with self._cache_lock:
+            self._result_cache[key] = [self._copy_result(r) for r in results]
+
+    @staticmethod
+    def _copy_result(result: Dict) -> Dict:
+        """Copy a result along with its nested metadata dict."""
+        copied = dict(result)
+        if isinstance(copied.get("metadata"), dict):
+            copied["metadata"] = dict(copied["metadata"])
+        return copied
+
+    def stats(self) -> Dict:
+        """
+        Get retrieval cache statistics.
+
+        Returns:
+            Dictionary with cache sizes and result cache hit rate
+        """
+        with self._cache_lock:
+            lookups = self._result_hits + self._result_misses
+            return {
+                "result_cache_size": len(self._result_cache),
+                "result_cache_hits": self._result_hits,
+                "result_cache_misses": self._result_misses,
+                "result_cache_hit_rate": (
+                    self._result_hits / lookups if lookups else 0.0
+                ),
+                "embedding_cache_size": len(self._embedding_cache),
+                "search_cache_size": len(self._search_cache),
+            }
+
+    def _get_doc_metadata(self, doc_idx: int) -> Dict:
+        """Get stored metadata entry for an index position."""
+        if isinstance(self.metadata, dict):
+            return self.metadata.get(str(doc_idx), {})
+        elif isinstance(self.metadata, list):
+            return self.metadata[doc_idx] if 0 <= doc_idx < len(self.metadata) else {}
+        return {}
+
+    def get_metadata_batch(self, doc_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Look up the stored metadata of several chunks in one call.
+
+        Args:
+            doc_ids: Index positions, as returned in each result's doc_id
+
+        Returns:
+            Mapping of index position to chunk metadata
+        """
+        return {
+            doc_id: self._get_doc_metadata(doc_id).get("metadata", {})
+            for doc_id in doc_ids
+        }
+
+    def _collect_results(
+        self,
+        distances: np.ndarray,
+        indices: np.ndarray,
+        top_k: int,
+        similarity_threshold: float,
+    ) -> List[Dict]:
+        """
+        Convert raw FAISS hits into deduplicated, thresholded results.
+
+        Args:
+            distances: Similarity scores for a single query
+            indices: Index positions for a single query
+            top_k: Number of documents to return
+            similarity_threshold: Minimum similarity score
+
+        Returns:
+            List of retrieved documents with metadata and scores
+        """
+        # Drop empty slots (-1) and clamp inner-product scores to [0, 1]
+        valid = indices >= 0
+        doc_indices = indices[valid]
+        scores = np.clip(distances[valid], 0.0, 1.0)
+
+        # FIX: If max score is below edge case min score, consider this a low-quality retrieval
+        # Return empty results to trigger "no information" response
+        max_score = float(scores.max()) if scores.size else 0.0
+        if max_score < self.edge_case_min_score:
+            logger.warning(
+                f"Low retrieval quality (max score: {max_score:.2%}). "
+                f"Returning no results for out-of-scope query."
+            )
+            return []
+
+        # Hits are sorted by score, so thresholding before deduplication
+        # only drops documents that could never be returned
+        above = scores >= similarity_threshold
+
+        results = []
+        seen_sources = set()
+
+        for doc_idx, score in zip(doc_indices[above].tolist(), scores[above].tolist()):
+            doc_metadata = self._get_doc_metadata(doc_idx)
+
+            md = doc_metadata.get("metadata", {})
+            source_file = md.get("source", "")
+
+            # Deduplicate by source file
+            if source_file in seen_sources:
+                continue
+            seen_sources.add(source_file)
+
+            results.append(
+                {
+                    "content": doc_metadata.get("content", ""),
+                    "content_tokens": doc_metadata.get("content_tokens"),
+                    "metadata": md,
+                    "source": source_file,
+                    "filename": md.get("filename", "Unknown"),
+                    "file_type": md.get("file_type", ""),
+                    "score": score,
+                    "doc_id": doc_idx,
+                }
+            )
+
+            # Stop once we have enough unique sources
+            if len(results) >= top_k:
+                break
+
+        logger.info(
+            "Retrieved %d unique documents (threshold: %s)",
+            len(results),
+            similarity_threshold,
+        )
+
+        return results
+
+    def _filter_mask(self, metadata_filter: Dict) -> np.ndarray:
+        """
+        Resolve a metadata filter to a mask over the index positions.
+
+        Args:
+            metadata_filter: Dictionary of metadata filters
+
+        Returns:
+            Boolean array of length ntotal, True for matching documents
+        """
+        mask = np.ones(self.index.ntotal, dtype=bool)
+        for key, value in metadata_filter.items():
+            column = self.meta_cols.get(key)
+            if column is None:
+                mask[:] = False
+                break
+            mask &= column == value
+        return mask
+
     def retrieve_with_metadata_filter(
         self, query: str, metadata_filter: Dict, top_k: Optional[int] = None
     ) -> List[Dict]:
         """
         Retrieve documents with metadata filtering.
 
+        Filters are resolved to a vectorized mask over the metadata columns
+        and applied inside FAISS with a bitmap ID selector, so only matching
+        documents are searched and each candidate is checked in O(1).
+
         Args:
             query: Search query
             metadata_filter: Dictionary of metadata filters (e.g., {"file_type": ".pdf"})
@@ -166,26 +487,72 @@ class Retriever:
         Returns:
             Filtered list of retrieved documents
         """
-        # Get initial results
-        results = self.retrieve(
-            query, top_k=top_k * 2
-        )  # Get more to account for filtering
-
-        # Apply metadata filters
-        filtered_results = []
-        for result in results:
-            metadata = result["metadata"]
-            if all(metadata.get(k) == v for k, v in metadata_filter.items()):
-                filtered_results.append(result)
+        if top_k is None:
+            top_k = self.top_k
 
-        # Limit to top_k
-        if top_k:
-            filtered_results = filtered_results[:top_k]
+        result_key = self._result_key(
+            query, top_k, self.similarity_threshold, metadata_filter
+        )
+        cached = self._get_cached_results(result_key)
+        if cached is not None:
+            return cached
+
+        mask = self._filter_mask(metadata_filter)
+        num_matches = int(mask.sum())
+
+        if num_matches == 0:
+            filtered_results = []
+        else:
+            query_vector = self._embed_query(query)
+            # The selector does not own the bitmap, which must stay alive
+            # until the search returns
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(
+                self.index.ntotal, faiss.swig_ptr(bitmap)
+            )
+            params = self._search_params(selector)
+            distances, indices = self.index.search(
+                query_vector, min(top_k * 3, num_matches), params=params
+            )
+            filtered_results = self._collect_results(
+                distances[0], indices[0], top_k, self.similarity_threshold
+            )
+            if self.rerank:
+                filtered_results = self._rerank_results(query, filtered_results)
 
-        logger.info(f"Filtered to {len(filtered_results)} documents matching criteria")
+        logger.info(
+            "Filtered to %d documents matching criteria", len(filtered_results)
+        )
 
+        self._store_results(result_key, filtered_results)
         return filtered_results
 
+    def _search_params(
+        self, selector: faiss.IDSelector, index: Optional[faiss.Index] = None
+    ) -> faiss.SearchParameters:
+        """Build search parameters restricting results to a selector."""
+        if index is None:
+            index = self.index
+
+        # Typed parameters replace the index defaults, so carry them over
+        if hasattr(index, "k_factor"):
+            base_index = faiss.downcast_index(index.base_index)
+            return faiss.IndexRefineSearchParameters(
+                k_factor=index.k_factor,
+                base_index_params=self._search_params(selector, base_index),
+            )
+
+        if hasattr(index, "hnsw"):
+            return faiss.SearchParametersHNSW(
+                sel=selector, efSearch=index.hnsw.efSearch
+            )
+
+        try:
+            ivf = faiss.extract_index_ivf(index)
+            return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        except RuntimeError:
+            return faiss.SearchParameters(sel=selector)
+
     def _preprocess_query(self, query: str) -> str:
         """
         Preprocess query for better retrieval.
@@ -4,17 +4,62 @@ Evaluation utilities for RAG chatbot.
 Provides metrics and tools for assessing retrieval and generation quality.
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, FrozenSet, Optional, Tuple
 import numpy as np
 from dataclasses import dataclass
 from datetime import datetime
+import hashlib
 import json
+import os
+import re
+import shelve
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config.prompts import QUERY_PROMPT_TEMPLATE, CHAT_PROMPT_TEMPLATE
 from src.retrieval.rag_pipeline import RAGPipeline
 from src.retrieval.retriever import Retriever
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Concurrent LLM calls when evaluating a test set
+EVAL_WORKERS = 8
+
+# Suggested location of the opt-in on-disk cache of evaluated queries
+EVAL_CACHE_PATH = ".cache/eval"
+
+# Sentence terminators, ignoring decimal points such as "3.5"
+_SENT_SPLIT_RE = re.compile(r"(?<!\d)[.!?]+|[.!?]+(?!\d)")
+
+# Important words: alphanumeric tokens longer than 4 chars
+_WORD_RE = re.compile(r"[a-z0-9]{5,}")
+
+
+def _split_sentences(text: str) -> List[str]:
+    """Split text into stripped sentences longer than 10 characters."""
+    return [s for s in map(str.strip, _SENT_SPLIT_RE.split(text)) if len(s) > 10]
+
+
+@dataclass(frozen=True)
+class Analysis:
+    """Tokenization of a text shared by the individual scorers."""
+
+    sentences: List[str]
+    tokens: FrozenSet[str]
+    lower: str
+    length: int
+
+
+def _analyze(text: str) -> Analysis:
+    """Lowercase, split and tokenize text in a single pass."""
+    lower = text.lower()
+    return Analysis(
+        sentences=_split_sentences(text),
+        tokens=frozenset(_WORD_RE.findall(lower)),
+        lower=lower,
+        length=len(text),
+    )
+
 
 @dataclass
 class EvaluationResult:
@@ -42,21 +87,129 @@ class EvaluationResult:
 class RAGEvaluator:
     """Evaluates RAG chatbot performance."""
 
-    def __init__(self, pipeline: RAGPipeline):
+    def __init__(self, pipeline: RAGPipeline, cache_path: Optional[str] = None):
         """
         Initialize evaluator.
 
         Args:
             pipeline: RAGPipeline instance to evaluate
+            cache_path: Path of an on-disk result cache reused across runs
+                (e.g. EVAL_CACHE_PATH); None disables caching
         """
         self.pipeline = pipeline
+
+        # Cached results are only valid for the pipeline configuration
+        # that produced them
+        self._pipeline_version = self._compute_pipeline_version()
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            self._cache = shelve.open(cache_path)
+
         logger.info("Initialized RAG Evaluator")
 
+    def _compute_pipeline_version(self) -> str:
+        """
+        Hash everything that influences evaluation results.
+
+        Covers the generation and retrieval settings, the prompt templates
+        and a fingerprint of the loaded index, so a reindex or a template
+        change invalidates cached results.
+        """
+        retriever = self.pipeline.retriever
+        index_file = retriever.index_builder.index_path / "index.faiss"
+        try:
+            index_mtime = os.stat(index_file).st_mtime_ns
+        except OSError:
+            index_mtime = None
+
+        config = [
+            self.pipeline.model,
+            self.pipeline.temperature,
+            self.pipeline.max_tokens,
+            self.pipeline._system_prompt,
+            self.pipeline.edge_case_min_score,
+            self.pipeline.prompt_builder.max_context_length,
+            QUERY_PROMPT_TEMPLATE,
+            CHAT_PROMPT_TEMPLATE,
+            retriever.top_k,
+            retriever.similarity_threshold,
+            retriever.edge_case_min_score,
+            retriever.rerank,
+            retriever.index_builder.index_type,
+            retriever.index.ntotal,
+            index_mtime,
+        ]
+        return hashlib.sha1(json.dumps(config, default=str).encode()).hexdigest()
+
+    def _cache_key(
+        self,
+        question: str,
+        expected_answer: Optional[str],
+        expected_keywords: Optional[List[str]],
+        expected_topics: Optional[List[str]],
+    ) -> str:
+        """Build the result cache key for one evaluated query."""
+        payload = json.dumps(
+            [
+                self._pipeline_version,
+                question,
+                expected_answer,
+                expected_keywords,
+                expected_topics,
+            ]
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _cached_result(
+        self,
+        question: str,
+        expected_answer: Optional[str] = None,
+        expected_keywords: Optional[List[str]] = None,
+        expected_topics: Optional[List[str]] = None,
+    ) -> Optional[EvaluationResult]:
+        """Return the cached evaluation of a query, or None on a miss."""
+        if self._cache is None:
+            return None
+
+        cache_key = self._cache_key(
+            question, expected_answer, expected_keywords, expected_topics
+        )
+        with self._cache_lock:
+            return self._cache.get(cache_key)
+
+    def close(self):
+        """Flush and close the on-disk result cache."""
+        with self._cache_lock:
+            if self._cache is not None:
+                self._cache.close()
+                self._cache = None
+
+    @staticmethod
+    def _doc_tokens(retrieved_docs: List[Dict]) -> Optional[set]:
+        """
+        Union of the token sets precomputed by IndexBuilder.
+
+        Returns:
+            Set of lowercase tokens, or None if any document lacks them
+        """
+        token_sets = [doc.get("content_tokens") for doc in retrieved_docs]
+        if any(tokens is None for tokens in token_sets):
+            return None
+        return set().union(*token_sets)
+
+    @staticmethod
+    def _join_context(retrieved_docs: List[Dict]) -> str:
+        """Join the content of retrieved documents into one string."""
+        return " ".join([doc.get("content", "") for doc in retrieved_docs])
+
     def evaluate_retrieval(
         self,
         query: str,
         retrieved_docs: List[Dict],
         expected_keywords: Optional[List[str]] = None,
+        context: Optional[str] = None,
     ) -> float:
         """
         Evaluate retrieval quality.
@@ -65,6 +218,7 @@ class RAGEvaluator:
             query: Search query
             retrieved_docs: Retrieved documents
             expected_keywords: Optional keywords that should appear
+            context: Optional pre-joined content of the retrieved documents
 
         Returns:
             Retrieval quality score (0-1)
@@ -80,10 +234,22 @@ class RAGEvaluator:
 
         # Check if expected keywords are present
         if expected_keywords:
-            content = " ".join([doc.get("content", "") for doc in retrieved_docs])
-            keyword_matches = sum(
-                1 for kw in expected_keywords if kw.lower() in content.lower()
-            )
+            doc_tokens = self._doc_tokens(retrieved_docs)
+            content_lower = None
+            keyword_matches = 0
+            for kw in expected_keywords:
+                kw_lower = kw.lower()
+                # A whole-token hit implies a substring hit; only scan the
+                # joined content for keywords that miss the token sets
+                if doc_tokens is not None and kw_lower in doc_tokens:
+                    keyword_matches += 1
+                    continue
+                if content_lower is None:
+                    if context is None:
+                        context = self._join_context(retrieved_docs)
+                    content_lower = context.lower()
+                if kw_lower in content_lower:
+                    keyword_matches += 1
             keyword_score = keyword_matches / len(expected_keywords)
             score += keyword_score * 0.6
         else:
@@ -92,7 +258,13 @@ class RAGEvaluator:
 
         return min(score, 1.0)
 
-    def evaluate_faithfulness(self, answer: str, retrieved_docs: List[Dict]) -> float:
+    def evaluate_faithfulness(
+        self,
+        answer: str,
+        retrieved_docs: List[Dict],
+        answer_analysis: Optional[Analysis] = None,
+        context: Optional[str] = None,
+    ) -> float:
         """
         Evaluate if answer is faithful to retrieved context.
 
@@ -102,6 +274,8 @@ class RAGEvaluator:
         Args:
             answer: Generated answer
             retrieved_docs: Retrieved documents
+            answer_analysis: Optional precomputed analysis of the answer
+            context: Optional pre-joined content of the retrieved documents
 
         Returns:
             Faithfulness score (0-1)
@@ -110,26 +284,31 @@ class RAGEvaluator:
             return 0.0
 
         # Extract key phrases (simple approach: split on sentences)
-        answer_sentences = [s.strip() for s in answer.split(".") if len(s.strip()) > 10]
+        if answer_analysis is None:
+            answer_analysis = _analyze(answer)
+        answer_sentences = answer_analysis.sentences
 
         if not answer_sentences:
             return 0.5  # Neutral score for very short answers
 
-        # Combine all retrieved content
-        context = " ".join([doc.get("content", "") for doc in retrieved_docs])
-        context_lower = context.lower()
+        # Tokenize all retrieved content once for O(1) membership tests,
+        # reusing tokens precomputed at index build time when available
+        context_tokens = self._doc_tokens(retrieved_docs)
+        if context_tokens is None:
+            if context is None:
+                context = self._join_context(retrieved_docs)
+            context_tokens = set(_WORD_RE.findall(context.lower()))
 
         # Check how many answer phrases appear in context
         faithful_count = 0
         for sentence in answer_sentences:
-            # Extract important words (simple: words longer than 4 chars)
-            important_words = [w.lower() for w in sentence.split() if len(w) > 4]
+            important_words = _WORD_RE.findall(sentence.lower())
 
             if not important_words:
                 continue
 
             # Check if majority of important words appear in context
-            matches = sum(1 for word in important_words if word in context_lower)
+            matches = sum(1 for word in important_words if word in context_tokens)
             if matches / len(important_words) >= 0.6:
                 faithful_count += 1
 
@@ -137,7 +316,12 @@ class RAGEvaluator:
         return faithfulness
 
     def evaluate_relevance(
-        self, question: str, answer: str, expected_topics: Optional[List[str]] = None
+        self,
+        question: str,
+        answer: str,
+        expected_topics: Optional[List[str]] = None,
+        question_analysis: Optional[Analysis] = None,
+        answer_analysis: Optional[Analysis] = None,
     ) -> float:
         """
         Evaluate answer relevance to question.
@@ -146,6 +330,8 @@ class RAGEvaluator:
             question: User question
             answer: Generated answer
             expected_topics: Optional topics that should be covered
+            question_analysis: Optional precomputed analysis of the question
+            answer_analysis: Optional precomputed analysis of the answer
 
         Returns:
             Relevance score (0-1)
@@ -156,8 +342,12 @@ class RAGEvaluator:
         score = 0.5  # Base score for non-empty answer
 
         # Check if answer contains question keywords
-        question_words = set(w.lower() for w in question.split() if len(w) > 4)
-        answer_words = set(w.lower() for w in answer.split())
+        if question_analysis is None:
+            question_analysis = _analyze(question)
+        if answer_analysis is None:
+            answer_analysis = _analyze(answer)
+        question_words = question_analysis.tokens
+        answer_words = answer_analysis.tokens
 
         keyword_overlap = len(question_words & answer_words)
         if question_words:
@@ -165,7 +355,7 @@ class RAGEvaluator:
 
         # Check for expected topics
         if expected_topics:
-            answer_lower = answer.lower()
+            answer_lower = answer_analysis.lower
             topic_matches = sum(
                 1 for topic in expected_topics if topic.lower() in answer_lower
             )
@@ -173,13 +363,19 @@ class RAGEvaluator:
 
         return min(score, 1.0)
 
-    def evaluate_completeness(self, answer: str, min_length: int = 50) -> float:
+    def evaluate_completeness(
+        self,
+        answer: str,
+        min_length: int = 50,
+        answer_analysis: Optional[Analysis] = None,
+    ) -> float:
         """
         Evaluate answer completeness.
 
         Args:
             answer: Generated answer
             min_length: Minimum expected answer length
+            answer_analysis: Optional precomputed analysis of the answer
 
         Returns:
             Completeness score (0-1)
@@ -187,11 +383,14 @@ class RAGEvaluator:
         if not answer:
             return 0.0
 
+        if answer_analysis is None:
+            answer_analysis = _analyze(answer)
+
         # Length-based score
-        length_score = min(len(answer) / min_length, 1.0) * 0.5
+        length_score = min(answer_analysis.length / min_length, 1.0) * 0.5
 
         # Structure score (has multiple sentences)
-        sentences = [s for s in answer.split(".") if len(s.strip()) > 10]
+        sentences = answer_analysis.sentences
         structure_score = min(len(sentences) / 3, 1.0) * 0.5
 
         return length_score + structure_score
@@ -202,6 +401,7 @@ class RAGEvaluator:
         expected_answer: Optional[str] = None,
         expected_keywords: Optional[List[str]] = None,
         expected_topics: Optional[List[str]] = None,
+        retrieved_docs: Optional[List[Dict]] = None,
     ) -> EvaluationResult:
         """
         Comprehensive evaluation of a single query.
@@ -211,29 +411,52 @@ class RAGEvaluator:
             expected_answer: Optional expected answer for comparison
             expected_keywords: Keywords that should appear in retrieved docs
             expected_topics: Topics that should be covered in answer
+            retrieved_docs: Pre-retrieved documents (skips retrieval)
 
         Returns:
             EvaluationResult with all metrics
         """
-        logger.info(f"Evaluating query: {question}")
+        logger.info("Evaluating query: %.100s", question)
+
+        cached = self._cached_result(
+            question, expected_answer, expected_keywords, expected_topics
+        )
+        if cached is not None:
+            logger.debug("Evaluation cache hit: %.100s", question)
+            return cached
 
         # Get response from pipeline
-        result = self.pipeline.query(question)
+        result = self.pipeline.query(question, retrieved_docs=retrieved_docs)
         answer = result.get("answer", "")
         retrieved_docs = result.get("retrieved_docs", [])
 
+        # Tokenize question and answer once for all scorers
+        question_analysis = _analyze(question)
+        answer_analysis = _analyze(answer)
+        context = self._join_context(retrieved_docs)
+
         # Calculate metrics
         retrieval_score = self.evaluate_retrieval(
-            question, retrieved_docs, expected_keywords
+            question, retrieved_docs, expected_keywords, context=context
         )
 
         top_doc_relevance = retrieved_docs[0].get("score", 0) if retrieved_docs else 0
 
-        faithfulness_score = self.evaluate_faithfulness(answer, retrieved_docs)
+        faithfulness_score = self.evaluate_faithfulness(
+            answer, retrieved_docs, answer_analysis=answer_analysis, context=context
+        )
 
-        relevance_score = self.evaluate_relevance(question, answer, expected_topics)
+        relevance_score = self.evaluate_relevance(
+            question,
+            answer,
+            expected_topics,
+            question_analysis=question_analysis,
+            answer_analysis=answer_analysis,
+        )
 
-        completeness_score = self.evaluate_completeness(answer)
+        completeness_score = self.evaluate_completeness(
+            answer, answer_analysis=answer_analysis
+        )
 
         # Overall score (weighted average)
         overall_score = (
@@ -243,7 +466,7 @@ class RAGEvaluator:
             + completeness_score * 0.2
         )
 
-        return EvaluationResult(
+        evaluation = EvaluationResult(
             question=question,
             answer=answer,
             expected_answer=expected_answer,
@@ -256,6 +479,27 @@ class RAGEvaluator:
             overall_score=overall_score,
         )
 
+        if self._cache is not None:
+            cache_key = self._cache_key(
+                question, expected_answer, expected_keywords, expected_topics
+            )
+            with self._cache_lock:
+                if self._cache is not None:
+                    self._cache[cache_key] = evaluation
+
+        return evaluation
+
+    def _evaluate_test_case(
+        self, test_case: Dict, retrieved_docs: List[Dict]
+    ) -> EvaluationResult:
+        """Evaluate one test case dict with pre-retrieved documents."""
+        return self.evaluate_query(
+            question=test_case["question"],
+            expected_keywords=test_case.get("expected_keywords"),
+            expected_topics=test_case.get("expected_topics"),
+            retrieved_docs=retrieved_docs,
+        )
+
     def evaluate_test_set(self, test_cases: List[Dict]) -> Dict:
         """
         Evaluate multiple test cases.
@@ -267,23 +511,68 @@ class RAGEvaluator:
         Returns:
             Dictionary with aggregate results and individual scores
         """
-        results = []
-
-        for test_case in test_cases:
-            result = self.evaluate_query(
-                question=test_case["question"],
+        # Serve cached test cases first so only the misses hit the pipeline
+        results = [
+            self._cached_result(
+                test_case["question"],
                 expected_keywords=test_case.get("expected_keywords"),
                 expected_topics=test_case.get("expected_topics"),
             )
-            results.append(result)
+            for test_case in test_cases
+        ]
+        misses = [i for i, result in enumerate(results) if result is None]
+        logger.info(f"{len(test_cases) - len(misses)} test cases served from cache")
+
+        # Evaluate each distinct test case once and share its result with
+        # every duplicate in this run
+        indices_by_key: Dict[str, List[int]] = {}
+        for i in misses:
+            test_case = test_cases[i]
+            cache_key = self._cache_key(
+                test_case["question"],
+                None,
+                test_case.get("expected_keywords"),
+                test_case.get("expected_topics"),
+            )
+            indices_by_key.setdefault(cache_key, []).append(i)
+
+        if indices_by_key:
+            unique_cases = [test_cases[idx[0]] for idx in indices_by_key.values()]
+
+            # Retrieve for the misses in one batched FAISS search
+            all_retrieved_docs = self.pipeline.retriever.retrieve_batch(
+                [test_case["question"] for test_case in unique_cases]
+            )
+
+            # Fan the I/O-bound LLM step out across threads
+            with ThreadPoolExecutor(max_workers=EVAL_WORKERS) as executor:
+                evaluated = executor.map(
+                    self._evaluate_test_case, unique_cases, all_retrieved_docs
+                )
+                for indices, result in zip(indices_by_key.values(), evaluated):
+                    for i in indices:
+                        results[i] = result
+
+        # One row of metric scores per test case
+        scores = np.empty((len(results), 5), dtype=np.float64)
+
+        for i, result in enumerate(results):
+            scores[i] = (
+                result.retrieval_score,
+                result.faithfulness_score,
+                result.relevance_score,
+                result.completeness_score,
+                result.overall_score,
+            )
 
         # Calculate aggregate metrics
+        means = scores.mean(axis=0)
         avg_metrics = {
-            "avg_retrieval_score": np.mean([r.retrieval_score for r in results]),
-            "avg_faithfulness": np.mean([r.faithfulness_score for r in results]),
-            "avg_relevance": np.mean([r.relevance_score for r in results]),
-            "avg_completeness": np.mean([r.completeness_score for r in results]),
-            "avg_overall_score": np.mean([r.overall_score for r in results]),
+            "avg_retrieval_score": means[0],
+            "avg_faithfulness": means[1],
+            "avg_relevance": means[2],
+            "avg_completeness": means[3],
+            "avg_overall_score": means[4],
             "total_queries": len(results),
         }
 
@@ -336,7 +625,7 @@ def generate_evaluation_report(
 if __name__ == "__main__":
     # Initialize pipeline
     pipeline = RAGPipeline()
-    evaluator = RAGEvaluator(pipeline)
+    evaluator = RAGEvaluator(pipeline, cache_path=EVAL_CACHE_PATH)
 
     # Sample test cases
     test_cases = [
@@ -354,6 +643,7 @@ if __name__ == "__main__":
 
     # Run evaluation
     results = evaluator.evaluate_test_set(test_cases)
+    evaluator.close()
 
     # Generate report
     generate_evaluation_report(results)
@@ -1,7 +1,11 @@
+import atexit
 import logging
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
 
@@ -17,16 +21,32 @@ class ColoredFormatter(logging.Formatter):
     }
     RESET = "\033[0m"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._colored = {
+            level: f"{color}{level}{self.RESET}" for level, color in self.COLORS.items()
+        }
+
     def format(self, record):
-        log_color = self.COLORS.get(record.levelname, self.RESET)
-        record.levelname = f"{log_color}{record.levelname}{self.RESET}"
-        return super().format(record)
+        # Restore the plain level name so other handlers see it undecorated
+        original = record.levelname
+        record.levelname = self._colored.get(original, original)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = original
+
+
+# One background listener per log file; loggers only enqueue records
+_file_queues: Dict[Path, queue.Queue] = {}
 
 
 class Logger:
     """Modular logger for the application."""
 
     _instances = {}
+    # Reentrant: get_logger holds it while __init__ attaches handlers
+    _lock = threading.RLock()
 
     def __init__(
         self,
@@ -49,13 +69,15 @@ class Logger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(getattr(logging, log_level.upper()))
 
-        # Prevent duplicate handlers
-        if not self.logger.handlers:
-            if log_to_console:
-                self._add_console_handler()
+        # Prevent duplicate handlers (logging.getLogger returns one logger per
+        # name, so concurrent construction must not attach handlers twice)
+        with Logger._lock:
+            if not self.logger.handlers:
+                if log_to_console:
+                    self._add_console_handler()
 
-            if log_to_file:
-                self._add_file_handler(log_dir or Path("logs"))
+                if log_to_file:
+                    self._add_file_handler(log_dir or Path("logs"))
 
     def _add_console_handler(self):
         """Add console handler with colored output."""
@@ -70,19 +92,38 @@ class Logger:
         self.logger.addHandler(console_handler)
 
     def _add_file_handler(self, log_dir: Path):
-        """Add file handler for persistent logging."""
+        """
+        Add file handler for persistent logging.
+
+        Records are put on a queue and written by a background
+        QueueListener, so logging calls never block on disk I/O.
+        """
         log_dir.mkdir(parents=True, exist_ok=True)
 
-        log_file = log_dir / f"app_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
+        log_file = (log_dir / f"app_{datetime.now().strftime('%Y%m%d')}.log").resolve()
 
-        file_formatter = logging.Formatter(
-            fmt="%(asctime)s [%(levelname)s] %(name)s (%(filename)s:%(lineno)d) - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
+        log_queue = _file_queues.get(log_file)
+        if log_queue is None:
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setLevel(logging.DEBUG)
+
+            file_formatter = logging.Formatter(
+                fmt="%(asctime)s [%(levelname)s] %(name)s (%(filename)s:%(lineno)d) - %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+            file_handler.setFormatter(file_formatter)
+
+            log_queue = queue.Queue(-1)
+            listener = QueueListener(
+                log_queue, file_handler, respect_handler_level=True
+            )
+            listener.start()
+            atexit.register(listener.stop)
+            _file_queues[log_file] = log_queue
+
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.setLevel(logging.DEBUG)
+        self.logger.addHandler(queue_handler)
 
     def debug(self, message: str, *args, **kwargs):
         """Log debug message."""
@@ -134,12 +175,15 @@ def get_logger(
         >>> logger = get_logger(__name__)
         >>> logger.info("Application started")
     """
-    if name not in Logger._instances:
-        Logger._instances[name] = Logger(
-            name=name,
-            log_level=log_level,
-            log_dir=log_dir,
-            log_to_file=log_to_file,
-            log_to_console=log_to_console,
-        )
-    return Logger._instances[name]
+    with Logger._lock:
+        instance = Logger._instances.get(name)
+        if instance is None:
+            instance = Logger(
+                name=name,
+                log_level=log_level,
+                log_dir=log_dir,
+                log_to_file=log_to_file,
+                log_to_console=log_to_console,
+            )
+            Logger._instances[name] = instance
+        return instance
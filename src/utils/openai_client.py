@@ -0,0 +1,56 @@
+import threading
+from typing import Optional
+
+import httpx
+from openai import OpenAI
+
+from src.utils.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger(__name__)
+
+# Connection pool limits for the shared HTTP client
+HTTP_TIMEOUT = 60
+MAX_KEEPALIVE_CONNECTIONS = 64
+MAX_CONNECTIONS = 128
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def _build_http_client() -> httpx.Client:
+    """Build a keep-alive HTTP client, using HTTP/2 when `h2` is installed."""
+    limits = httpx.Limits(
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        max_connections=MAX_CONNECTIONS,
+    )
+    try:
+        return httpx.Client(http2=True, timeout=HTTP_TIMEOUT, limits=limits)
+    except ImportError:
+        logger.warning("h2 not installed, falling back to HTTP/1.1")
+        return httpx.Client(timeout=HTTP_TIMEOUT, limits=limits)
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Get the process-wide OpenAI client.
+
+    The client is created once and shared by the pipeline, embedder and
+    LLM wrapper so that completions and embeddings reuse warm TCP+TLS
+    connections instead of opening a new pool per instance.
+
+    Returns:
+        Shared OpenAI client
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=settings.openai.api_key,
+                    http_client=_build_http_client(),
+                )
+                logger.info("Initialized shared OpenAI client")
+
+    return _client
@@ -20,10 +20,143 @@ Author: Srikanth Gali
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Set, Tuple
 from datetime import datetime
 
+# Concurrent file creations; kept well below typical open-handle limits
+FILE_WORKERS = 16
+
+# Directories of the generated layout
+_DIRECTORIES: Tuple[str, ...] = (
+    # Data
+    "data/raw",
+    "data/processed",
+    # Core source code
+    "src/config",
+    "src/ingestion",
+    "src/embeddings",
+    "src/retrieval",
+    "src/generation",
+    "src/utils",
+    # API
+    "api",
+    # Streamlit UI
+    "ui/streamlit_app/components",
+    "ui/streamlit_app/styles",
+    # Storage
+    "vector_store",
+    "vector_store/faiss_index",
+    # Logs
+    "logs",
+    # Tests (basic)
+    "tests",
+    # Documentation
+    "docs",
+    # Notebooks for exploration and evaluation
+    "notebooks",
+)
+
+# Files of the generated layout
+_FILES: Tuple[str, ...] = (
+    # Root configuration
+    ".gitignore",
+    ".env.example",
+    "README.md",
+    "requirements.txt",
+    "config.yaml",
+    # Source - Config
+    "src/__init__.py",
+    "src/config/__init__.py",
+    "src/config/settings.py",
+    "src/config/logging_config.yaml",
+    "src/config/prompts.py",
+    # Source - Data Ingestion
+    "src/ingestion/__init__.py",
+    "src/ingestion/document_loader.py",
+    "src/ingestion/text_processor.py",
+    # Source - Embeddings
+    "src/embeddings/__init__.py",
+    "src/embeddings/embedder.py",
+    "src/embeddings/build_index.py",
+    # Source - Retrieval
+    "src/retrieval/__init__.py",
+    "src/retrieval/retriever.py",
+    "src/retrieval/rag_pipeline.py",
+    # Source - Generation
+    "src/generation/__init__.py",
+    "src/generation/llm.py",
+    "src/generation/prompt_builder.py",
+    # Source - Utils
+    "src/utils/__init__.py",
+    "src/utils/logger.py",
+    "src/utils/helpers.py",
+    # API
+    "api/__init__.py",
+    "api/main.py",
+    "api/models.py",
+    "api/endpoints.py",
+    # Streamlit UI
+    "ui/streamlit_app/__init__.py",
+    "ui/streamlit_app/app.py",
+    "ui/streamlit_app/components/__init__.py",
+    "ui/streamlit_app/components/chat.py",
+    "ui/streamlit_app/components/sidebar.py",
+    "ui/streamlit_app/styles/custom.css",
+    # Scripts
+    "scripts/ingest_documents.py",
+    # Tests
+    "tests/__init__.py",
+    "tests/test_retrieval.py",
+    "tests/test_generation.py",
+    # Documentation
+    "docs/SETUP.md",
+    "docs/API_DOCS.md",
+    "docs/ARCHITECTURE.md",
+    # Notebooks
+    "notebooks/exploration.ipynb",
+    "notebooks/evaluation.ipynb",
+    # Main entry points
+    "main.py",
+    "run_api.py",
+    "run_streamlit.py",
+)
+
+# Directories that start out empty and get a .gitkeep
+_GITKEEP_DIRS: Tuple[str, ...] = (
+    "data/raw",
+    "data/processed",
+    "vector_store",
+    "logs",
+)
+
+# Every file to create, including the .gitkeep placeholders
+_ALL_FILES: Tuple[str, ...] = _FILES + tuple(f"{d}/.gitkeep" for d in _GITKEEP_DIRS)
+
+# Unique parent directories of all files, created before any file
+_PARENTS: Tuple[str, ...] = tuple(
+    sorted({os.path.dirname(f) for f in _ALL_FILES} - {""})
+)
+
+
+def _with_ancestors(paths: Iterable[str]) -> Set[str]:
+    """Expand relative paths with every ancestor directory they imply."""
+    result = set()
+    for path in paths:
+        while path and path not in result:
+            result.add(path)
+            path = os.path.dirname(path)
+    return result
+
+
+# Everything to create as (path, kind), sorted so that each directory
+# precedes its contents and all directories precede the files
+_MANIFEST: Tuple[Tuple[str, str], ...] = tuple(
+    (d, "dir") for d in sorted(_with_ancestors(_DIRECTORIES + _PARENTS))
+) + tuple((f, "file") for f in _ALL_FILES)
+
 
 class RAGChatbotProjectGenerator:
     """
@@ -36,7 +169,10 @@ class RAGChatbotProjectGenerator:
     Attributes:
         project_name (str): Name of the project
         base_path (Path): Base directory path where project will be created
+        base_path_str (str): Absolute base_path as a string for os-level calls
         created_count (int): Counter for tracking created files/directories
+        _entries_by_parent (Dict[str, Set[str]]): Names found in each scanned
+            directory, relative to base_path
 
     Example:
         >>> generator = RAGChatbotProjectGenerator()
@@ -52,7 +188,9 @@ class RAGChatbotProjectGenerator:
         """
         self.project_name = project_name
         self.base_path = Path(".")
+        self.base_path_str = os.path.abspath(self.base_path)
         self.created_count = 0
+        self._entries_by_parent: Dict[str, Set[str]] = {}
 
     def create_project_structure(self) -> None:
         """
@@ -67,150 +205,113 @@ class RAGChatbotProjectGenerator:
         logging.info(f"Creating project structure for {self.project_name}")
         logging.info(f"Base path: {self.base_path.absolute()}")
 
-        self._create_directories()
-        self._create_files()
-        self._create_gitkeep_files()
+        self._entries_by_parent = {}
+        self._create_entries()
 
         logging.info(
             f"✓ {self.project_name} structure created successfully at: {self.base_path.absolute()}"
         )
         logging.info(f"✓ Total new files and directories created: {self.created_count}")
 
-    def _create_directories(self) -> None:
+    def _entries(self, parent: str) -> Set[str]:
         """
-        Create essential project directories.
+        Names of the entries in a directory, scanned once per run.
+
+        A single os.listdir() per parent answers every existence check for
+        its children without a stat call per path. Only names are needed,
+        so the DirEntry objects built by os.scandir() would be wasted.
+
+        Args:
+            parent (str): Directory path relative to base_path ("" for the root)
 
-        Minimal structure focused on core functionality.
+        Returns:
+            Set[str]: Entry names, empty if the directory does not exist
         """
-        directories = [
-            # Data
-            "data/raw",
-            "data/processed",
-            # Core source code
-            "src/config",
-            "src/ingestion",
-            "src/embeddings",
-            "src/retrieval",
-            "src/generation",
-            "src/utils",
-            # API
-            "api",
-            # Streamlit UI
-            "ui/streamlit_app/components",
-            "ui/streamlit_app/styles",
-            # Storage
-            "vector_store",
-            "vector_store/faiss_index",
-            # Logs
-            "logs",
-            # Tests (basic)
-            "tests",
-            # Documentation
-            "docs",
-            # Notebooks for exploration and evaluation
-            "notebooks",
-        ]
-
-        for directory in directories:
-            dir_path = self.base_path / directory
-            if not dir_path.exists():
-                dir_path.mkdir(parents=True, exist_ok=True)
-                self.created_count += 1
-                logging.info(f"✓ Created: {directory}")
+        entries = self._entries_by_parent.get(parent)
+        if entries is None:
+            try:
+                entries = set(os.listdir(os.path.join(self.base_path_str, parent)))
+            except FileNotFoundError:
+                entries = set()
+            self._entries_by_parent[parent] = entries
+        return entries
+
+    def _exists(self, path: str) -> bool:
+        """Check whether a path relative to base_path exists."""
+        parent, name = os.path.split(path)
+        return name in self._entries(parent)
+
+    def _mark_created(self, path: str) -> None:
+        """Record a newly created path in the scanned entries."""
+        parent, name = os.path.split(path)
+        self._entries(parent).add(name)
+
+    def _mkdir(self, directory: str) -> bool:
+        """
+        Create a single directory whose parent already exists.
+
+        Args:
+            directory (str): Directory path relative to base_path
+
+        Returns:
+            bool: True if the directory was created
+        """
+        try:
+            os.mkdir(os.path.join(self.base_path_str, directory))
+        except FileExistsError:
+            return False
+        return True
 
-    def _create_files(self) -> None:
+    def _touch(self, file_path_str: str) -> bool:
         """
-        Create essential project files.
+        Create an empty file unless it already exists.
+
+        O_CREAT|O_EXCL checks and creates in a single open() call.
+
+        Args:
+            file_path_str (str): File path relative to base_path
 
-        Focused on must-have files for a working demo and interview presentation.
+        Returns:
+            bool: True if the file was created
+        """
+        try:
+            fd = os.open(
+                os.path.join(self.base_path_str, file_path_str),
+                os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                0o644,
+            )
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
+
+    def _create_entries(self) -> None:
         """
-        files = [
-            # Root configuration
-            ".gitignore",
-            ".env.example",
-            "README.md",
-            "requirements.txt",
-            "config.yaml",
-            # Source - Config
-            "src/__init__.py",
-            "src/config/__init__.py",
-            "src/config/settings.py",
-            "src/config/logging_config.yaml",
-            "src/config/prompts.py",
-            # Source - Data Ingestion
-            "src/ingestion/__init__.py",
-            "src/ingestion/document_loader.py",
-            "src/ingestion/text_processor.py",
-            # Source - Embeddings
-            "src/embeddings/__init__.py",
-            "src/embeddings/embedder.py",
-            "src/embeddings/build_index.py",
-            # Source - Retrieval
-            "src/retrieval/__init__.py",
-            "src/retrieval/retriever.py",
-            "src/retrieval/rag_pipeline.py",
-            # Source - Generation
-            "src/generation/__init__.py",
-            "src/generation/llm.py",
-            "src/generation/prompt_builder.py",
-            # Source - Utils
-            "src/utils/__init__.py",
-            "src/utils/logger.py",
-            "src/utils/helpers.py",
-            # API
-            "api/__init__.py",
-            "api/main.py",
-            "api/models.py",
-            "api/endpoints.py",
-            # Streamlit UI
-            "ui/streamlit_app/__init__.py",
-            "ui/streamlit_app/app.py",
-            "ui/streamlit_app/components/__init__.py",
-            "ui/streamlit_app/components/chat.py",
-            "ui/streamlit_app/components/sidebar.py",
-            "ui/streamlit_app/styles/custom.css",
-            # Scripts
-            "scripts/ingest_documents.py",
-            # Tests
-            "tests/__init__.py",
-            "tests/test_retrieval.py",
-            "tests/test_generation.py",
-            # Documentation
-            "docs/SETUP.md",
-            "docs/API_DOCS.md",
-            "docs/ARCHITECTURE.md",
-            # Notebooks
-            "notebooks/exploration.ipynb",
-            "notebooks/evaluation.ipynb",
-            # Main entry points
-            "main.py",
-            "run_api.py",
-            "run_streamlit.py",
-        ]
-
-        for file_path_str in files:
-            file_path = self.base_path / file_path_str
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            if not file_path.exists():
-                file_path.touch()
+        Create all project directories and files in one pass over _MANIFEST.
+
+        Directories are created in order, one mkdir each, since their parents
+        precede them. Missing files are then created concurrently.
+        """
+        missing_files = []
+        for path, kind in _MANIFEST:
+            if self._exists(path):
+                continue
+            if kind == "file":
+                missing_files.append(path)
+                continue
+            if self._mkdir(path):
                 self.created_count += 1
-                logging.info(f"✓ Created: {file_path_str}")
+                logging.info(f"✓ Created: {path}")
+            self._mark_created(path)
 
-    def _create_gitkeep_files(self) -> None:
-        """Create .gitkeep files in empty directories."""
-        gitkeep_dirs = [
-            "data/raw",
-            "data/processed",
-            "vector_store",
-            "logs",
-        ]
-
-        for gitkeep_dir in gitkeep_dirs:
-            gitkeep_path = self.base_path / gitkeep_dir / ".gitkeep"
-            if not gitkeep_path.exists():
-                gitkeep_path.touch()
+        with ThreadPoolExecutor(max_workers=FILE_WORKERS) as executor:
+            created = list(executor.map(self._touch, missing_files))
+
+        for file_path_str, was_created in zip(missing_files, created):
+            self._mark_created(file_path_str)
+            if was_created:
                 self.created_count += 1
-                logging.info(f"✓ Created: {gitkeep_dir}/.gitkeep")
+                logging.info(f"✓ Created: {file_path_str}")
 
     def generate_summary_report(self) -> Dict[str, any]:
         """
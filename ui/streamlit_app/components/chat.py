@@ -2,160 +2,548 @@
 Chat interface component for the Streamlit app.
 """
 
+from __future__ import annotations
+
+import json
 import streamlit as st
 import requests
-from typing import Dict, List, Any
+import textwrap
+import time
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from contextlib import closing
+from typing import Any, Generator, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Characters of source content kept in session state per source
+SOURCE_PREVIEW_CHARS = 400
+
+# (button label, question) pairs offered on an empty chat
+SAMPLE_PROMPTS = (
+    ("👋 Hello!", "Hi! What can you help me with?"),
+    ("🎯 GitLab's Mission", "What is GitLab's mission?"),
+    ("🏖️ Time Off", "How do I request time off?"),
+)
+
+# Openings marking an assistant reply as small talk rather than an answer
+_GREETING_PREFIXES = ("hello", "hi ", "hi!", "hi,", "i'm ", "i can help")
+
+# Opening of the pipeline's out-of-scope reply
+_OOS_PREFIX = "I don't have enough information"
+
+# Most recent messages always rendered; older ones are shown on request
+HISTORY_WINDOW = 20
+
+# Appended to an answer whose generation was stopped part-way
+INTERRUPTED_SUFFIX = "\n\n_(answer interrupted)_"
+
+# Minimum seconds between placeholder redraws while an answer streams
+STREAM_REFRESH_SECONDS = 0.05
+
+# (connect, read) timeouts; connecting fails fast so a dead API is reported
+# quickly, while generation may pause between chunks when streaming
+STREAM_TIMEOUT = (3, None)
+
+# (connect, read) timeouts for the debug-only source metadata fetch
+METADATA_TIMEOUT = (1, 5)
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Get the pooled HTTP session shared by all browser sessions.
+
+    Keeps connections to the API alive across questions and reruns instead
+    of opening a new TCP connection per request. Gateway errors are retried
+    for idempotent requests such as the health check.
+
+    Returns:
+        Shared requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def stream_api(
+    session: requests.Session,
+    api_url: str,
+    question: str,
+    max_sources: int,
+    meta: dict[str, Any],
+) -> Iterator[str]:
+    """
+    Stream an answer from the API's server-sent events endpoint.
+
+    Args:
+        session: HTTP session to send the request with
+        api_url: Base URL of the API
+        question: User question
+        max_sources: Maximum number of sources to return
+        meta: Filled with the final event's sources and query_time
+
+    Yields:
+        Answer text chunks as they are generated
+
+    Raises:
+        requests.HTTPError: If the API rejects the request
+        RuntimeError: If the API reports an error mid-stream
+    """
+    with session.post(
+        f"{api_url}/api/query/stream",
+        data=_json_dumps({"question": question, "max_sources": max_sources}),
+        headers={"Content-Type": "application/json"},
+        stream=True,
+        timeout=STREAM_TIMEOUT,
+    ) as response:
+        if response.status_code != 200:
+            # Read the error body while the connection is still open
+            response.content
+            response.raise_for_status()
+
+        for line in response.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            event = _json_loads(line[6:])
+            if "token" in event:
+                yield event["token"]
+            elif "error" in event:
+                raise RuntimeError(event["error"])
+            else:
+                meta.update(event)
+
+
+def fetch_source_metadata(api_url: str, doc_ids: list[int]) -> dict[int, dict]:
+    """
+    Fetch the metadata of several sources with a single API call.
+
+    Args:
+        api_url: Base URL of the API
+        doc_ids: doc_id of each source
+
+    Returns:
+        Mapping of doc_id to source metadata
+    """
+    response = get_http_session().post(
+        f"{api_url}/api/sources/batch",
+        data=_json_dumps({"ids": doc_ids}),
+        headers={"Content-Type": "application/json"},
+        timeout=METADATA_TIMEOUT,
+    )
+    response.raise_for_status()
+    metadata = parse_response(response)["metadata"]
+    return {int(doc_id): md for doc_id, md in metadata.items()}
+
+
+def _hydrate_metadata(sources: list[dict]):
+    """
+    Fill in missing source metadata in place, once per message.
+
+    The sources are the dicts stored in session state, so fetched metadata
+    and failed fetches are both kept for later reruns; a failure is not
+    retried on every rerun.
+    """
+    missing = [
+        source["doc_id"]
+        for source in sources
+        if source.get("metadata") is None
+        and source.get("doc_id") is not None
+        and "metadata_error" not in source
+    ]
+    if not missing:
+        return
+
+    api_url = st.session_state.get("api_url", "http://localhost:8000")
+    try:
+        metadata = fetch_source_metadata(api_url, missing)
+    except requests.exceptions.RequestException as e:
+        error = f"Metadata unavailable ({type(e).__name__})"
+        for source in sources:
+            if source.get("doc_id") in missing:
+                source["metadata_error"] = error
+                source["debug_json"] = _debug_json({"metadata_error": error})
+        return
+
+    for source in sources:
+        md = metadata.get(source.get("doc_id"))
+        if md is not None:
+            source["metadata"] = md
+            source["debug_json"] = _debug_json(md)
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON with orjson, falling back to the stdlib."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode JSON with orjson, falling back to the stdlib."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def parse_response(response: requests.Response) -> Any:
+    """
+    Decode a JSON API response.
+
+    Args:
+        response: Raw API response
+
+    Returns:
+        Decoded JSON payload
+    """
+    return _json_loads(response.content)
+
+
+def _debug_json(obj: Any) -> str:
+    """Serialize a debug payload to indented JSON for st.code."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _trim_sources(sources: list[dict]) -> tuple[list[dict], float]:
+    """
+    Truncate source content before it is stored in session state.
+
+    Also serializes each source's metadata once, so debug views replay a
+    string instead of re-serializing on every rerun.
+
+    Args:
+        sources: Sources returned by the API
+
+    Returns:
+        Tuple of (copies of the sources with content cut to
+        SOURCE_PREVIEW_CHARS, highest source score or 0)
+    """
+    trimmed = []
+    max_score = 0.0
+    for source in sources:
+        score = source.get("score", 0)
+        if score > max_score:
+            max_score = score
+        content = source.get("content") or ""
+        trimmed.append(
+            {
+                **source,
+                "content": content[:SOURCE_PREVIEW_CHARS],
+                "preview_truncated": len(content) > SOURCE_PREVIEW_CHARS,
+                "debug_json": (
+                    _debug_json(source["metadata"])
+                    if source.get("metadata") is not None
+                    else None
+                ),
+            }
+        )
+    return trimmed, max_score
+
+
+@lru_cache(maxsize=1024)
+def _format_source_key(name: str, score: float, idx: int) -> str:
+    """Format one source from hashable fields, memoized across reruns."""
+    return f"**Source {idx}**: `{name}`\n**Relevance**: {score:.2%}"
+
+
+def _format_source(source: dict, idx: int) -> str:
+    """Format one source as a markdown snippet."""
+    return _format_source_key(
+        source.get("source", "Unknown"), round(source.get("score", 0), 4), idx
+    )
+
+
+def render_sources(sources: list[dict]) -> str:
+    """
+    Render a list of sources to markdown once, for replay on every rerun.
+
+    Args:
+        sources: Sources returned by the API
+
+    Returns:
+        Markdown for all sources
+    """
+    return "\n\n".join(
+        _format_source(source, idx) for idx, source in enumerate(sources, 1)
+    )
+
+
+def _looks_like_greeting(text: str) -> bool:
+    """Check whether an assistant reply opens like small talk."""
+    return text[:40].lower().startswith(_GREETING_PREFIXES)
+
+
+def _debug_json_array(sources: list[dict]) -> str:
+    """
+    Join the pre-serialized metadata of each source into one JSON array.
+
+    Args:
+        sources: Stored sources, with debug_json where available
+
+    Returns:
+        Indented JSON array of the sources' metadata
+    """
+    items = []
+    for source in sources:
+        debug_json = source.get("debug_json")
+        if debug_json is None:
+            debug_json = _debug_json(source.get("metadata") or {})
+        items.append(textwrap.indent(debug_json, "  "))
+    return "[\n" + ",\n".join(items) + "\n]"
+
+
+def _render_sources_panel(
+    content: str,
+    sources: list[dict] = None,
+    show_debug: bool = False,
+    rendered_sources: str = None,
+):
+    """Render the sources of an assistant reply inside its chat bubble."""
+    if sources:
+        with st.expander(f"📚 Sources ({len(sources)})"):
+            st.markdown(rendered_sources or render_sources(sources))
+
+            if show_debug:
+                _hydrate_metadata(sources)
+                st.code(_debug_json_array(sources), language="json")
+    elif content.startswith(_OOS_PREFIX):
+        # Out-of-scope query
+        st.info("ℹ️ No relevant sources found in the knowledge base.")
+    # Don't show "no sources" for greetings
+    elif not _looks_like_greeting(content):
+        st.info("ℹ️ No relevant sources found in the knowledge base.")
 
 
 def display_message(
-    role: str, content: str, sources: List[Dict] = None, show_debug: bool = False
+    role: str,
+    content: str,
+    sources: list[dict] = None,
+    show_debug: bool = False,
+    rendered_sources: str = None,
 ):
     """Display a chat message with optional sources."""
     with st.chat_message(role):
         st.markdown(content)
 
-        # Display sources if available (not for greetings)
-        if sources and role == "assistant":
-            if len(sources) > 0:
-                with st.expander(f"📚 Sources ({len(sources)})"):
-                    for idx, source in enumerate(sources, 1):
-                        score = source.get("score", 0)
-                        st.markdown(
-                            f"""
-                        **Source {idx}**: `{source.get('source', 'Unknown')}`
-                        **Relevance**: {score:.2%}
-                        """
-                        )
-                        # Show debug info if enabled
-                        if show_debug:
-                            st.json(source.get("metadata", {}))
-            elif content.startswith("I don't have enough information"):
-                # Out-of-scope query
-                st.info("ℹ️ No relevant sources found in the knowledge base.")
-            # ADDED: Don't show "no sources" for greetings
-            elif not any(
-                greeting in content.lower()
-                for greeting in ["hello", "hi", "i'm", "i can help"]
-            ):
-                st.info("ℹ️ No relevant sources found in the knowledge base.")
-
-
-def render_chat(config: Dict[str, Any]):
+        if role == "assistant":
+            _render_sources_panel(content, sources, show_debug, rendered_sources)
+
+
+def _render_history(show_debug: bool):
     """
-    Render the chat interface.
+    Replay the chat history.
+
+    Only the last HISTORY_WINDOW messages are rendered unless the user asks
+    for earlier ones. An answer streamed inline during the last full run is
+    skipped, since that run's output is still on screen below the history.
 
     Args:
-        config: Configuration dictionary from sidebar
+        show_debug: Whether to show per-source debug metadata
     """
-    # Get API URL from session state
-    api_url = st.session_state.get("api_url", "http://localhost:8000")
-    max_sources = config.get("max_sources", 5)
-    show_debug = config.get("show_debug", False)
+    messages = st.session_state.messages
+    start = 0
+    if len(messages) > HISTORY_WINDOW and not st.toggle(
+        f"Show earlier {len(messages) - HISTORY_WINDOW} messages"
+    ):
+        start = len(messages) - HISTORY_WINDOW
 
-    # Display chat messages in scrollable container
-    for message in st.session_state.messages:
+    streamed_index = st.session_state.get("_streamed_index")
+    for index in range(start, len(messages)):
+        if index == streamed_index:
+            continue
+        message = messages[index]
         display_message(
             message["role"],
             message["content"],
             message.get("sources"),
             show_debug=show_debug,
+            rendered_sources=message.get("rendered_sources"),
         )
 
-    # Chat input (will be fixed at bottom via CSS)
-    if prompt := st.chat_input("Ask a question about GitLab..."):
-        # Add user message
+
+def _write_stream(chunks: Generator[str, None, None], parts: list[str]) -> str:
+    """
+    Progressively render streamed answer chunks into a placeholder.
+
+    Redraws are throttled to STREAM_REFRESH_SECONDS so fast token streams
+    do not flood the websocket with one delta per chunk. The generator is
+    closed however the loop ends, so a stopped run drops the connection and
+    the API stops generating.
+
+    Args:
+        chunks: Answer text chunks
+        parts: Filled with the chunks as they arrive
+
+    Returns:
+        The complete answer
+    """
+    placeholder = st.empty()
+    last_draw = 0.0
+    with closing(chunks):
+        for chunk in chunks:
+            parts.append(chunk)
+            now = time.monotonic()
+            if now - last_draw >= STREAM_REFRESH_SECONDS:
+                placeholder.markdown("".join(parts) + "▌")
+                last_draw = now
+
+    answer = "".join(parts)
+    placeholder.markdown(answer)
+    return answer
+
+
+def _render_sample_prompts():
+    """Offer sample questions; a click is answered like a typed question."""
+    st.markdown("### 💬 Try asking:")
+
+    for col, (label, question) in zip(st.columns(len(SAMPLE_PROMPTS)), SAMPLE_PROMPTS):
+        with col:
+            if st.button(label, use_container_width=True):
+                st.session_state.sample_prompt = question
+
+
+@st.fragment
+def _render_conversation(show_debug: bool):
+    """
+    Render the sample prompts, the chat history and the chat input.
+
+    Runs as a fragment, so showing earlier messages or picking a sample
+    prompt reruns only this block. Submitting a question queues it in
+    st.session_state._pending_prompt and reruns the app, whose render_chat
+    call streams the answer outside the fragment.
+
+    Args:
+        show_debug: Whether to show per-source debug metadata
+    """
+    # Show sample prompts if no messages
+    if not st.session_state.messages:
+        _render_sample_prompts()
+
+    # Display chat messages in scrollable container
+    _render_history(show_debug)
+
+    # Chat input (will be fixed at bottom via CSS); a clicked sample prompt
+    # is handled like a typed question
+    prompt = st.chat_input("Ask a question about GitLab...")
+    prompt = prompt or st.session_state.pop("sample_prompt", None)
+    if prompt:
+        # Record the question and rerun at once, so the history renders it
+        # exactly once; the answer is fetched on that next run
         st.session_state.messages.append({"role": "user", "content": prompt})
+        st.session_state._pending_prompt = prompt
+        st.rerun()
+
 
-        # Display user message immediately
-        with st.chat_message("user"):
-            st.markdown(prompt)
-
-        # Query the API
-        with st.spinner("🤔 Thinking..."):
-            try:
-                response = requests.post(
-                    f"{api_url}/api/query",
-                    json={"question": prompt, "max_sources": max_sources},
-                    timeout=30,
+def render_chat(config: dict[str, Any]):
+    """
+    Render the chat interface.
+
+    The history and input run as a fragment, while the answer is streamed
+    in the full script run so the Stop button's app rerun can interrupt it.
+
+    Args:
+        config: Configuration dictionary from sidebar
+    """
+    # Get API URL from session state
+    api_url = st.session_state.get("api_url", "http://localhost:8000")
+    max_sources = config.get("max_sources", 5)
+    show_debug = config.get("show_debug", False)
+    st.session_state.setdefault("_pending_prompt", None)
+
+    # A full run renders every message through the history again
+    st.session_state._streamed_index = None
+    _render_conversation(show_debug)
+
+    prompt = st.session_state._pending_prompt
+    if prompt:
+        st.session_state._pending_prompt = None
+
+        # Clicking Stop reruns the script, which interrupts this run at the
+        # next redraw of the streamed answer
+        stop_slot = st.empty()
+        stop_slot.button("⏹ Stop", key=f"stop_{len(st.session_state.messages)}")
+
+        # Stream the answer from the API
+        parts = []
+        try:
+            meta = {}
+            with st.chat_message("assistant"):
+                answer = _write_stream(
+                    stream_api(get_http_session(), api_url, prompt, max_sources, meta),
+                    parts,
                 )
+                stop_slot.empty()
+                sources, max_score = _trim_sources(meta.get("sources", []))
+                rendered_sources = render_sources(sources)
+                _render_sources_panel(answer, sources, show_debug, rendered_sources)
 
-                if response.status_code == 200:
-                    result = response.json()
-                    answer = result.get("answer", "No answer generated")
-                    sources = result.get("sources", [])
+            # Add assistant message; it stays on screen inline, so fragment
+            # reruns of the history leave it out until the next full run
+            st.session_state.messages.append(
+                {
+                    "role": "assistant",
+                    "content": answer,
+                    "sources": sources,
+                    "rendered_sources": rendered_sources,
+                }
+            )
+            st.session_state._streamed_index = len(st.session_state.messages) - 1
 
-                    # Add assistant message
-                    st.session_state.messages.append(
-                        {"role": "assistant", "content": answer, "sources": sources}
+            # Show debug info if enabled
+            if show_debug:
+                with st.expander("🔍 Debug Info"):
+                    st.code(
+                        _debug_json(
+                            {
+                                "query_time": meta.get("query_time"),
+                                "model": meta.get("model", "unknown"),
+                                "num_sources": len(sources),
+                                "max_score": max_score,
+                            }
+                        ),
+                        language="json",
                     )
 
-                    # Display assistant response immediately
-                    with st.chat_message("assistant"):
-                        st.markdown(answer)
-
-                        # Display sources if available
-                        if sources:
-                            if len(sources) > 0:
-                                with st.expander(f"📚 Sources ({len(sources)})"):
-                                    for idx, source in enumerate(sources, 1):
-                                        score = source.get("score", 0)
-                                        st.markdown(
-                                            f"""
-                                        **Source {idx}**: `{source.get('source', 'Unknown')}`
-                                        **Relevance**: {score:.2%}
-                                        """
-                                        )
-                                        if show_debug:
-                                            st.json(source.get("metadata", {}))
-                            elif answer.startswith("I don't have enough information"):
-                                st.info(
-                                    "ℹ️ No relevant sources found in the knowledge base."
-                                )
-                            elif not any(
-                                greeting in answer.lower()
-                                for greeting in ["hello", "hi", "i'm", "i can help"]
-                            ):
-                                st.info(
-                                    "ℹ️ No relevant sources found in the knowledge base."
-                                )
-
-                    # Show debug info if enabled
-                    if show_debug:
-                        with st.expander("🔍 Debug Info"):
-                            st.json(
-                                {
-                                    "query_time": result.get("query_time"),
-                                    "model": result.get("model", "unknown"),
-                                    "num_sources": len(sources),
-                                    "max_score": (
-                                        max([s.get("score", 0) for s in sources])
-                                        if sources
-                                        else 0
-                                    ),
-                                }
-                            )
-
-                    # Force rerun to update the full chat history
-                    st.rerun()
-
-                else:
-                    st.error(f"❌ API Error: {response.status_code}")
-                    st.json(response.json())
-
-            except requests.exceptions.ConnectionError:
-                st.error(
-                    """
-                    ❌ **Could not connect to API**
-
-                    Please ensure the API is running:
-                    ```bash
-                    python run_api.py
-                    ```
-                    """
+        except requests.exceptions.HTTPError as e:
+            st.error(f"❌ API Error: {e.response.status_code}")
+            st.code(e.response.text, language="json")
+        except requests.exceptions.ConnectionError:
+            st.error(
+                """
+                ❌ **Could not connect to API**
+
+                Please ensure the API is running:
+                ```bash
+                python run_api.py
+                ```
+                """
+            )
+        except requests.exceptions.Timeout:
+            st.error("⏱️ Request timed out. Please try again.")
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+            if show_debug:
+                st.exception(e)
+        finally:
+            # Keep a stopped answer's text; the rerun renders it from history
+            if parts and st.session_state.messages[-1]["role"] == "user":
+                st.session_state.messages.append(
+                    {
+                        "role": "assistant",
+                        "content": "".join(parts) + INTERRUPTED_SUFFIX,
+                    }
                 )
-            except requests.exceptions.Timeout:
-                st.error("⏱️ Request timed out. Please try again.")
-            except Exception as e:
-                st.error(f"❌ Error: {str(e)}")
-                if show_debug:
-                    st.exception(e)
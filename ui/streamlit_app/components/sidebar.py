@@ -2,12 +2,84 @@
 Sidebar component for the Streamlit app.
 """
 
+from __future__ import annotations
+
 import streamlit as st
 import requests
-from typing import Dict, Any
+from typing import Any
+
+from ui.streamlit_app.components.chat import get_http_session
+
+# Seconds a health check result is reused across reruns
+HEALTH_CHECK_TTL = 10
+
+# (connect, read) timeouts for the health check
+HEALTH_CHECK_TIMEOUT = (1, 2)
+
+# Static sidebar text, built once at import
+MODEL_INFO_MD = """\
+**LLM**: GPT-4.1 mini
+**Embeddings**: Ada-002
+**Vector Store**: FAISS
+"""
+
+ABOUT_MD = """\
+**GitLab Knowledge Q&A Bot**
 
+Ask questions about GitLab company, values, policies,
+processes, and best practices.
 
-def render_sidebar() -> Dict[str, Any]:
+Built with:
+- 🦙 LlamaIndex
+- 🤖 OpenAI GPT-4.1 mini
+- 🔍 FAISS Vector Search
+- 🎈 Streamlit
+"""
+
+
+@st.cache_data(ttl=HEALTH_CHECK_TTL, show_spinner=False)
+def _check_api_health(api_url: str) -> tuple[bool, str]:
+    """
+    Poll the API health endpoint at most once per HEALTH_CHECK_TTL seconds.
+
+    Args:
+        api_url: Base URL of the API
+
+    Returns:
+        Tuple of (healthy, detail) where detail is the HTTP status or the
+        connection failure
+    """
+    try:
+        response = get_http_session().get(
+            f"{api_url}/health", timeout=HEALTH_CHECK_TIMEOUT
+        )
+        return response.status_code == 200, f"HTTP {response.status_code}"
+    except requests.exceptions.RequestException as e:
+        return False, type(e).__name__
+
+
+def render_api_status(api_url: str):
+    """
+    Show the API connection status with a button to re-check it.
+
+    Args:
+        api_url: Base URL of the API
+    """
+    # Cached per URL, so a new URL is checked at once
+    healthy, detail = _check_api_health(api_url)
+    if healthy:
+        st.success("✅ Connected to API")
+    elif detail.startswith("HTTP"):
+        st.error(f"⚠️ API Error ({detail})")
+    else:
+        st.error(f"❌ API Unavailable ({detail})")
+
+    if st.button("🔄 Refresh status", use_container_width=True):
+        _check_api_health.clear()
+        st.rerun()
+
+
+def render_sidebar() -> dict[str, Any]:
     """
     Render the sidebar with configuration options.
 
@@ -19,16 +91,7 @@ def render_sidebar() -> Dict[str, Any]:
 
         # API Connection Status (compact)
         api_url = st.session_state.get("api_url", "http://localhost:8000")
-
-        # Check API health
-        try:
-            response = requests.get(f"{api_url}/health", timeout=2)
-            if response.status_code == 200:
-                st.success("✅ Connected to API")
-            else:
-                st.error("⚠️ API Error")
-        except requests.exceptions.RequestException:
-            st.error("❌ API Unavailable")
+        render_api_status(api_url)
 
         st.divider()
 
@@ -47,33 +110,13 @@ def render_sidebar() -> Dict[str, Any]:
 
         # Model Information
         st.subheader("🤖 Model Info")
-        st.info(
-            """
-            **LLM**: GPT-4.1 mini
-            **Embeddings**: Ada-002
-            **Vector Store**: FAISS
-            """,
-            icon="ℹ️",
-        )
+        st.info(MODEL_INFO_MD, icon="ℹ️")
 
         st.divider()
 
         # About Section
         st.subheader("ℹ️ About")
-        st.markdown(
-            """
-            **GitLab Knowledge Q&A Bot**
-
-            Ask questions about GitLab company, values, policies,
-            processes, and best practices.
-
-            Built with:
-            - 🦙 LlamaIndex
-            - 🤖 OpenAI GPT-4.1 mini
-            - 🔍 FAISS Vector Search
-            - 🎈 Streamlit
-            """
-        )
+        st.markdown(ABOUT_MD)
 
         # Advanced Settings (collapsible)
         with st.expander("🔧 Advanced"):